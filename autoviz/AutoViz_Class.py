@@ -24,16 +24,18 @@ import seaborn as sns
 import copy
 import time
 import traceback
-from pandas_dq import Fix_DQ, dq_report
 ##########################################################################################
-from autoviz.AutoViz_Holo import AutoViz_Holo
 from autoviz.AutoViz_Utils import draw_pivot_tables, draw_scatters
 from autoviz.AutoViz_Utils import draw_pair_scatters, draw_barplots, draw_heatmap
 from autoviz.AutoViz_Utils import draw_distplot, draw_violinplot, draw_date_vars, draw_catscatterplots
 from autoviz.AutoViz_Utils import list_difference
 from autoviz.AutoViz_Utils import find_remove_duplicates, classify_print_vars
-from autoviz.AutoViz_Utils import left_subtract
-from autoviz.AutoViz_NLP import draw_word_clouds
+from autoviz.AutoViz_Utils import left_subtract, copy_on_write, run_plot_tasks
+from autoviz.AutoViz_Utils import figure_stats, reset_figure_stats
+from autoviz.AutoViz_Utils import stage_stats, reset_stage_stats, stage_timer, write_stage_stats
+from autoviz.AutoViz_Utils import reset_correlation_cache
+from autoviz.classify_method import reset_date_cache
+from autoviz.AutoViz_DQ import FixDQ, data_cleaning_suggestions
 #######################################################################################
 sns.set(style="ticks", color_codes=True)
 matplotlib.use('agg')
@@ -162,6 +164,7 @@ class AutoViz_Class:
             'subheading': [],  # "\n".join(subheading)
             'desc': []  # "\n".join(desc)
         }  ######## This is for description and images for catscatter plots ###
+        self.stage_stats = pd.DataFrame()  ### time and memory used by each stage of the last AutoViz run ###
 
     def add_plots(self, plotname, X):
         """
@@ -190,7 +193,8 @@ class AutoViz_Class:
 
     def AutoViz(self, filename: (str or pd.DataFrame), sep=',', depVar='', dfte=None, header=0, verbose=1,
                 lowess=False, chart_format='svg', max_rows_analyzed=150000,
-                max_cols_analyzed=30, save_plot_dir=None):
+                max_cols_analyzed=30, save_plot_dir=None, n_jobs=1, density_threshold=20000,
+                save_to_disk=True, stats_file=None, download_nltk=False):
         """
         ##############################################################################
         ##### AUTOVIZ PERFORMS AUTOMATIC VISUALIZATION OF ANY DATA SET WITH ONE CLICK.
@@ -220,6 +224,20 @@ class AutoViz_Class:
         ####  charts on terminal                                                 #####
         ####  If verbose=2, it will print messages but will not display charts,  #####
         ####  it will simply save them.                                          #####
+        ####  n_jobs: number of processes that draw charts at the same time when  ####
+        ####  verbose=2. Use -1 for all CPUs. Default is 1 (one chart at a time). ####
+        ####  Charts are drawn in parallel only on Linux, by forked processes.   ####
+        ####  density_threshold: above this many rows, scatter plots show the     ####
+        ####  density of points (2-D histograms) instead of every single point.   ####
+        ####  Set it to None to always draw every point.                         ####
+        ####  save_to_disk: if False, charts drawn with verbose=2 are kept only in ###
+        ####  memory (in this class) and are not written to save_plot_dir.       ####
+        ####  stats_file: the time and memory used by each stage of the run are   ####
+        ####  kept in self.stage_stats. If stats_file is given, they are also     ####
+        ####  appended to it as JSON lines.                                      ####
+        ####  download_nltk: if True, NLTK data needed to lemmatize words in     ####
+        ####  wordclouds is downloaded when it is missing. By default AutoViz    ####
+        ####  never downloads it and does not lemmatize words if it is missing.  ####
         ##############################################################################
         """
         if isinstance(dfte, pd.DataFrame): ### if there is a dataframe, choose it
@@ -231,19 +249,38 @@ class AutoViz_Class:
         else:
             dep_var = copy.deepcopy(depVar)
               ####################################################################################
-        if chart_format.lower() in ['bokeh', 'server', 'bokeh_server', 'bokeh-server', 'html']:
-            dft = AutoViz_Holo(filename, sep, dep_var, header, verbose,
-                               lowess, chart_format, max_rows_analyzed,
-                               max_cols_analyzed, save_plot_dir)
-        else:
-            dft = self.AutoViz_Main(filename, sep, dep_var, header, verbose,
-                                    lowess, chart_format, max_rows_analyzed,
-                                    max_cols_analyzed, save_plot_dir)
+        #### all charts share one copy of the data: copy-on-write copies a column only if a chart changes it
+        #### and correlations and dates parsed in this run are shared by the charts and the SULO method
+        reset_correlation_cache()
+        reset_date_cache()
+        reset_stage_stats()
+        with copy_on_write():
+            if chart_format.lower() in ['bokeh', 'server', 'bokeh_server', 'bokeh-server', 'html']:
+                #### holoviews, bokeh and panel are imported only when they are needed ####
+                from autoviz.AutoViz_Holo import AutoViz_Holo
+                dft = AutoViz_Holo(filename, sep, dep_var, header, verbose,
+                                   lowess, chart_format, max_rows_analyzed,
+                                   max_cols_analyzed, save_plot_dir, density_threshold)
+            else:
+                dft = self.AutoViz_Main(filename, sep, dep_var, header, verbose,
+                                        lowess, chart_format, max_rows_analyzed,
+                                        max_cols_analyzed, save_plot_dir, n_jobs, density_threshold,
+                                        save_to_disk, download_nltk)
+            #### copy-on-write ends with this block, so the data returned must not share memory with the input
+            if isinstance(dft, pd.DataFrame) and int(pd.__version__.split('.')[0]) < 3:
+                dft = dft.copy()
+        #### the time and memory used by each stage are kept for both the matplotlib and bokeh charts ####
+        self.stage_stats = pd.DataFrame(stage_stats)
+        if stats_file is not None:
+            write_stage_stats(stage_stats, stats_file)
+        if verbose >= 2 and len(self.stage_stats) > 0:
+            print(self.stage_stats[['stage', 'wall_time', 'cpu_time', 'peak_rss_delta']].to_string(index=False))
         return dft
 
     def AutoViz_Main(self, filename: str or pd.DataFrame, sep=',', dep_var='', header=0, verbose=0,
                      lowess=False, chart_format='svg', max_rows_analyzed=150000,
-                     max_cols_analyzed=30, save_plot_dir=None):
+                     max_cols_analyzed=30, save_plot_dir=None, n_jobs=1, density_threshold=20000,
+                     save_to_disk=True, download_nltk=False):
         """
         ##############################################################################
         ##### AUTOVIZ_MAIN PERFORMS AUTO VISUALIZATION OF ANY DATA USING MATPLOTLIB ##
@@ -263,13 +300,17 @@ class AutoViz_Class:
             mk_dir = os.path.join(".", "AutoViz_Plots")
         else:
             mk_dir = copy.deepcopy(save_plot_dir)
-        if verbose == 2 and not os.path.isdir(mk_dir):
+        if verbose == 2 and save_to_disk and not os.path.isdir(mk_dir):
             os.mkdir(mk_dir)
         mk_dir = os.path.join(mk_dir, target_dir)
-        if verbose == 2 and not os.path.isdir(mk_dir):
+        if verbose == 2 and save_to_disk and not os.path.isdir(mk_dir):
             os.mkdir(mk_dir)
+        if not save_to_disk:
+            #### save_image_data keeps the charts in memory when there is no directory to save them in
+            mk_dir = None
         ############   Start the clock here and classify variables in data set first ########
         start_time = time.time()
+        reset_figure_stats()
 
         (dft, dep_var, id_cols, bool_vars, cats, continuous_vars, discrete_string_vars, date_vars, classes,
          problem_type, selected_cols) = classify_print_vars(filename, sep, max_rows_analyzed, max_cols_analyzed,
@@ -287,320 +328,125 @@ class AutoViz_Class:
                     print('depVar %s not found in given dataset. Please check your input and try again' % dep_var)
                     return dft
                 ### run the data cleaning report with a multi-label list of targets ##
-                data_cleaning_suggestions(dft, target=dep_var)
+                with stage_timer('dq_report', *dft.shape):
+                    data_cleaning_suggestions(dft, target=dep_var)
             else:
                 ### run the data cleaning report with a single-label target ##
-                data_cleaning_suggestions(dft, target=dep_var)
+                with stage_timer('dq_report', *dft.shape):
+                    data_cleaning_suggestions(dft, target=dep_var)
         else:
             ### run data cleaning report with no target ####
-            data_cleaning_suggestions(dft, target='')
+            with stage_timer('dq_report', *dft.shape):
+                data_cleaning_suggestions(dft, target='')
 
         ##### This is where we start plotting different kinds of charts depending on dependent variables
+        #### Each plot task draws one family of charts from dft: (plot name, draw function, arguments after dft,
+        #### error message). The tasks are independent of each other, so they can be drawn in parallel.
+        plot_tasks = []
         if dep_var is None or dep_var == '':
             ##### This is when No dependent Variable is given #######
             if len(continuous_vars) > 1:
-                try:
-                    svg_data = draw_pair_scatters(dft, continuous_vars, problem_type, verbose, chart_format,
-                                                  dep_var, classes, lowess, mk_dir)
-                    self.add_plots('pair_scatter', svg_data)
-                except Exception as e:
-                    print(e)
-                    print('Could not draw Pair Scatter Plots')
-            try:
-                svg_data = draw_distplot(dft, bool_vars + cats, continuous_vars, verbose, chart_format, problem_type,
-                                         dep_var, classes, mk_dir)
-                self.add_plots('dist_plot', svg_data)
-            except Exception as e:
-                print(f'Could not draw Distribution Plot. {e}')
-            try:
-                if len(continuous_vars) > 0:
-                    svg_data = draw_violinplot(dft, dep_var, continuous_vars, verbose, chart_format, problem_type,
-                                               mk_dir)
-                    self.add_plots('violin_plot', svg_data)
-                else:
-                    svg_data = draw_pivot_tables(dft, problem_type, verbose,
-                                                 chart_format, dep_var, mk_dir)
-                    self.add_plots('pivot_plot', svg_data)
-            except Exception as e:
-                print(f'Could not draw Distribution Plots {e}')
-            try:
-                #### Since there is no dependent variable in this dataset, you can leave it as-is
-                numeric_cols = dft.select_dtypes(include='number').columns.tolist()
-                numeric_cols = list_difference(numeric_cols, date_vars)
-                svg_data = draw_heatmap(dft, numeric_cols, verbose, chart_format, date_vars, dep_var,
-                                        problem_type, mk_dir)
-                self.add_plots('heat_map', svg_data)
-            except Exception as e:
-                print(f'Could not draw Heat Map {e}')
+                plot_tasks.append(('pair_scatter', draw_pair_scatters, (continuous_vars, problem_type, verbose,
+                                   chart_format, dep_var, classes, lowess, mk_dir, density_threshold),
+                                   'Could not draw Pair Scatter Plots'))
+            plot_tasks.append(('dist_plot', draw_distplot, (bool_vars + cats, continuous_vars, verbose, chart_format,
+                               problem_type, dep_var, classes, mk_dir), 'Could not draw Distribution Plot.'))
+            if len(continuous_vars) > 0:
+                plot_tasks.append(('violin_plot', draw_violinplot, (dep_var, continuous_vars, verbose, chart_format,
+                                   problem_type, mk_dir), 'Could not draw Distribution Plots'))
+            else:
+                plot_tasks.append(('pivot_plot', draw_pivot_tables, (problem_type, verbose, chart_format, dep_var,
+                                   mk_dir), 'Could not draw Distribution Plots'))
+            #### Since there is no dependent variable in this dataset, you can leave it as-is
+            numeric_cols = dft.select_dtypes(include='number').columns.tolist()
+            numeric_cols = list_difference(numeric_cols, date_vars)
+            plot_tasks.append(('heat_map', draw_heatmap, (numeric_cols, verbose, chart_format, date_vars, dep_var,
+                               problem_type, mk_dir), 'Could not draw Heat Map'))
             if date_vars != [] and len(continuous_vars) > 0:
-                try:
-                    svg_data = draw_date_vars(dft, dep_var, date_vars,
-                                              continuous_vars, verbose, chart_format, problem_type, mk_dir)
-                    self.add_plots('date_plot', svg_data)
-                except Exception as e:
-                    print(f'Could not draw Date Vars {e}')
+                plot_tasks.append(('date_plot', draw_date_vars, (dep_var, date_vars, continuous_vars, verbose,
+                                   chart_format, problem_type, mk_dir), 'Could not draw Date Vars'))
             if len(continuous_vars) > 0 and len(cats) > 0:
-                try:
-                    svg_data = draw_barplots(dft, cats, continuous_vars, problem_type,
-                                             verbose, chart_format, dep_var, mk_dir)
-                    self.add_plots('bar_plot', svg_data)
-                except Exception as e:
-                    print(f'Could not draw Bar Plots {e}')
-            else:
-                if len(cats) > 1:
-                    try:
-                        svg_data = draw_catscatterplots(dft, cats, verbose,
-                                                        chart_format, mk_dir=None)
-                        self.add_plots('catscatter_plot', svg_data)
-                    except Exception as e:
-                        print(f'Could not draw catscatter plots. {e}')
+                plot_tasks.append(('bar_plot', draw_barplots, (cats, continuous_vars, problem_type, verbose,
+                                   chart_format, dep_var, mk_dir), 'Could not draw Bar Plots'))
+            elif len(cats) > 1:
+                plot_tasks.append(('catscatter_plot', draw_catscatterplots, (cats, verbose, chart_format, mk_dir),
+                                   'Could not draw catscatter plots.'))
         else:
-            if problem_type == 'Regression':
-                ############## This is a Regression Problem #################
-                if len(continuous_vars) > 0:
-                    try:
-                        svg_data = draw_scatters(dft,
-                                                 continuous_vars, verbose, chart_format, problem_type, dep_var, classes,
-                                                 lowess, mk_dir)
-                        self.add_plots('scatter_plot', svg_data)
-                    except Exception as e:
-                        print("Exception Drawing Scatter Plots")
-                        print(e)
-                        traceback.print_exc()
-                        print('Could not draw Scatter Plots')
-                if len(continuous_vars) > 1:
-                    try:
-                        svg_data = draw_pair_scatters(dft, continuous_vars, problem_type, verbose, chart_format,
-                                                      dep_var, classes, lowess, mk_dir)
-                        self.add_plots('pair_scatter', svg_data)
-                    except Exception as e:
-                        print(f'Could not draw Pair Scatter Plots {e}')
-                try:
-                    if type(dep_var) == str:
-                        othernums = [x for x in continuous_vars if x not in [dep_var]]
-                    else:
-                        othernums = [x for x in continuous_vars if x not in dep_var]
-                    if len(othernums) >= 1:
-                        svg_data = draw_distplot(dft, bool_vars + cats, continuous_vars, verbose, chart_format,
-                                                 problem_type, dep_var, classes, mk_dir)
-                        self.add_plots('dist_plot', svg_data)
-                except Exception as e:
-                    print(f'Could not draw some Distribution Plots {e}')
-                try:
-                    if len(continuous_vars) > 0:
-                        svg_data = draw_violinplot(dft, dep_var, continuous_vars, verbose, chart_format, problem_type,
-                                                   mk_dir)
-                        self.add_plots('violin_plot', svg_data)
-                except Exception as e:
-                    print(f'Could not draw Violin Plots {e}')
-                try:
-                    numeric_cols = [x for x in dft.select_dtypes(include='number').columns.tolist() if
-                                    x not in [dep_var]]
-                    numeric_cols = list_difference(numeric_cols, date_vars)
-                    svg_data = draw_heatmap(dft,
-                                            numeric_cols, verbose, chart_format, date_vars, dep_var,
-                                            problem_type, mk_dir)
-                    self.add_plots('heat_map', svg_data)
-                except Exception as e:
-                    print(f'Could not draw some Heat Maps {e}')
-                if date_vars != [] and len(continuous_vars) > 0:
-                    try:
-                        svg_data = draw_date_vars(
-                            dft, dep_var, date_vars, continuous_vars, verbose, chart_format, problem_type, mk_dir)
-                        self.add_plots('date_plot', svg_data)
-                    except Exception as e:
-                        print(f'Could not draw some Time Series plots. {e}')
-                if len(cats) > 0 and len(continuous_vars) == 0:
-                    ### This is somewhat duplicative with distplot (above) - hence do it only minimally!
-                    try:
-                        svg_data = draw_pivot_tables(dft, problem_type, verbose,
-                                                     chart_format, dep_var, mk_dir)
-                        self.add_plots('pivot_plot', svg_data)
-                    except Exception as e:
-                        print(f'Could not draw some Pivot Charts against Dependent Variable {e}')
-                if len(continuous_vars) > 0 and len(cats) > 0:
-                    try:
-                        svg_data = draw_barplots(dft, find_remove_duplicates(cats + bool_vars), continuous_vars,
-                                                 problem_type, verbose, chart_format, dep_var, mk_dir)
-                        self.add_plots('bar_plot', svg_data)
-                        # self.add_plots('bar_plot',None)
-                    except Exception as e:
-                        print(f'Could not draw some Bar Charts {e}')
-                else:
-                    if len(cats) > 1:
-                        try:
-                            svg_data = draw_catscatterplots(dft, cats, verbose,
-                                                            chart_format, mk_dir=None)
-                            self.add_plots('catscatter_plot', svg_data)
-                        except Exception as e:
-                            print(f'Could not draw catscatter plots... {e}')
+            if type(dep_var) == str:
+                othernums = [x for x in continuous_vars if x not in [dep_var]]
             else:
-                ############ This is a Classification Problem ##################
-                if len(continuous_vars) > 0:
-                    try:
-                        svg_data = draw_scatters(dft, continuous_vars,
-                                                 verbose, chart_format, problem_type, dep_var, classes, lowess, mk_dir)
-                        self.add_plots('scatter_plot', svg_data)
-                    except Exception as e:
-                        print(e)
-                        traceback.print_exc()
-                        print('Could not draw some Scatter Plots')
-                if len(continuous_vars) > 1:
-                    try:
-                        svg_data = draw_pair_scatters(dft, continuous_vars,
-                                                      problem_type, verbose, chart_format, dep_var, classes, lowess,
-                                                      mk_dir)
-                        self.add_plots('pair_scatter', svg_data)
-                    except Exception as e:
-                        print(f'Could not draw some Pair Scatter Plots {e}')
-                try:
-                    if type(dep_var) == str:
-                        othernums = [x for x in continuous_vars if x not in [dep_var]]
-                    else:
-                        othernums = [x for x in continuous_vars if x not in dep_var]
-
-                    if len(othernums) >= 1:
-                        svg_data = draw_distplot(dft, bool_vars + cats, continuous_vars, verbose, chart_format,
-                                                 problem_type, dep_var, classes, mk_dir)
-                        self.add_plots('dist_plot', svg_data)
-                    else:
-                        print('No continuous var in data set: drawing categorical distribution plots')
-                except Exception as e:
-                    print(f'Could not draw some Distribution Plots {e}')
-                try:
-                    if len(continuous_vars) > 0:
-                        svg_data = draw_violinplot(dft, dep_var, continuous_vars, verbose, chart_format, problem_type,
-                                                   mk_dir)
-                        self.add_plots('violin_plot', svg_data)
-                except Exception as e:
-                    print(f'Could not draw some Violin Plots {e}')
-                try:
-                    numeric_cols = [x for x in dft.select_dtypes(include='number').columns.tolist() if
-                                    x not in [dep_var]]
-                    numeric_cols = list_difference(numeric_cols, date_vars)
-                    svg_data = draw_heatmap(dft, numeric_cols,
-                                            verbose, chart_format, date_vars, dep_var, problem_type,
-                                            mk_dir)
-                    self.add_plots('heat_map', svg_data)
-                except Exception as e:
-                    print(f'Could not draw some Heat Maps {e}')
-                if date_vars != [] and len(continuous_vars) > 0:
-                    try:
-                        svg_data = draw_date_vars(dft, dep_var, date_vars,
-                                                  continuous_vars, verbose, chart_format, problem_type, mk_dir)
-                        self.add_plots('date_plot', svg_data)
-                    except Exception as e:
-                        print(f'Could not draw some Time Series plots. {e}')
-                if len(cats) > 0 and len(continuous_vars) == 0:
-                    ### This is somewhat duplicative with distplot (above) - hence do it only minimally!
-                    try:
-                        svg_data = draw_pivot_tables(dft, problem_type, verbose,
-                                                     chart_format, dep_var, mk_dir)
-                        self.add_plots('pivot_plot', svg_data)
-                    except Exception as e:
-                        print(f'Could not draw some Pivot Charts against Dependent Variable {e}')
-                if len(continuous_vars) > 0 and len(cats) > 0:
-                    try:
-                        svg_data = draw_barplots(dft, find_remove_duplicates(cats + bool_vars), continuous_vars,
-                                                 problem_type,
-                                                 verbose, chart_format, dep_var, mk_dir)
-                        self.add_plots('bar_plot', svg_data)
-                        pass
-                    except Exception as e:
-                        if verbose <= 1:
-                            print(f'Could not draw some Bar Charts {e}')
-                        pass
-                else:
-                    if len(cats) > 1:
-                        try:
-                            svg_data = draw_catscatterplots(dft, cats, verbose,
-                                                            chart_format, mk_dir=None)
-                            self.add_plots('catscatter_plot', svg_data)
-                        except Exception as e:
-                            print(f'Could not draw catscatter plots. {e}')
+                othernums = [x for x in continuous_vars if x not in dep_var]
+            numeric_cols = [x for x in dft.select_dtypes(include='number').columns.tolist() if
+                            x not in [dep_var]]
+            numeric_cols = list_difference(numeric_cols, date_vars)
+            ######## Regression and Classification problems draw the same families of charts ########
+            if len(continuous_vars) > 0:
+                plot_tasks.append(('scatter_plot', draw_scatters, (continuous_vars, verbose, chart_format,
+                                   problem_type, dep_var, classes, lowess, mk_dir, density_threshold),
+                                   'Could not draw some Scatter Plots'))
+            if len(continuous_vars) > 1:
+                plot_tasks.append(('pair_scatter', draw_pair_scatters, (continuous_vars, problem_type, verbose,
+                                   chart_format, dep_var, classes, lowess, mk_dir, density_threshold),
+                                   'Could not draw some Pair Scatter Plots'))
+            if len(othernums) >= 1:
+                plot_tasks.append(('dist_plot', draw_distplot, (bool_vars + cats, continuous_vars, verbose,
+                                   chart_format, problem_type, dep_var, classes, mk_dir),
+                                   'Could not draw some Distribution Plots'))
+            elif problem_type != 'Regression':
+                print('No continuous var in data set: drawing categorical distribution plots')
+            if len(continuous_vars) > 0:
+                plot_tasks.append(('violin_plot', draw_violinplot, (dep_var, continuous_vars, verbose, chart_format,
+                                   problem_type, mk_dir), 'Could not draw some Violin Plots'))
+            plot_tasks.append(('heat_map', draw_heatmap, (numeric_cols, verbose, chart_format, date_vars, dep_var,
+                               problem_type, mk_dir), 'Could not draw some Heat Maps'))
+            if date_vars != [] and len(continuous_vars) > 0:
+                plot_tasks.append(('date_plot', draw_date_vars, (dep_var, date_vars, continuous_vars, verbose,
+                                   chart_format, problem_type, mk_dir), 'Could not draw some Time Series plots.'))
+            if len(cats) > 0 and len(continuous_vars) == 0:
+                ### This is somewhat duplicative with distplot (above) - hence do it only minimally!
+                plot_tasks.append(('pivot_plot', draw_pivot_tables, (problem_type, verbose, chart_format, dep_var,
+                                   mk_dir), 'Could not draw some Pivot Charts against Dependent Variable'))
+            if len(continuous_vars) > 0 and len(cats) > 0:
+                plot_tasks.append(('bar_plot', draw_barplots, (find_remove_duplicates(cats + bool_vars),
+                                   continuous_vars, problem_type, verbose, chart_format, dep_var, mk_dir),
+                                   'Could not draw some Bar Charts'))
+            elif len(cats) > 1:
+                plot_tasks.append(('catscatter_plot', draw_catscatterplots, (cats, verbose, chart_format, mk_dir),
+                                   'Could not draw catscatter plots.'))
+        #### Charts can be drawn in parallel only when they are saved to disk: they cannot be displayed ###
+        if n_jobs != 1 and verbose != 2:
+            print('    n_jobs is used only with verbose=2. Drawing plots one at a time...')
+            n_jobs = 1
         ###### Now you can check for NLP vars or discrete_string_vars to do wordcloud #######
         if len(discrete_string_vars) > 0:
             plotname = 'wordcloud'
-            import nltk
-            nltk.download('popular')
+            from autoviz.AutoViz_NLP import draw_word_clouds, load_lemmatizer
+            #### look for the NLTK data here once: forked workers inherit it ####
+            load_lemmatizer(download=download_nltk)
             for each_string_var in discrete_string_vars:
-                try:
-                    svg_data = draw_word_clouds(dft, each_string_var, chart_format, plotname,
-                                                dep_var, problem_type, classes, mk_dir, verbose=0)
-                    self.add_plots(plotname, svg_data)
-                except Exception as e:
-                    print(f'Could not draw wordcloud plot for {each_string_var}. {e}')
+                plot_tasks.append((plotname, draw_word_clouds, (each_string_var, chart_format, plotname, dep_var,
+                                   problem_type, classes, mk_dir, verbose, n_jobs),
+                                   'Could not draw wordcloud plot for %s.' % each_string_var,
+                                   'draw_word_clouds_%s' % each_string_var))
+        for plot_task, (svg_data, error_message) in zip(plot_tasks, run_plot_tasks(dft, plot_tasks, n_jobs, verbose)):
+            if error_message is None:
+                self.add_plots(plot_task[0], svg_data)
+            else:
+                print(error_message)
         ### Now print the time taken to run charts for AutoViz #############
         if verbose <= 1:
             print('All Plots done')
-        else:
+        elif mk_dir is not None:
             print('All Plots are saved in %s' % mk_dir)
+        else:
+            print('All Plots are kept in memory')
         print('Time to run AutoViz = %0.0f seconds ' % (time.time() - start_time))
+        if verbose >= 1 and n_jobs == 1:
+            print('    %d figures closed, %d figures still open' % (figure_stats['figures_closed'],
+                                                                  figure_stats['live_figures']))
+            if figure_stats['bytes_freed'] > 0:
+                print('    %0.1f MB freed by closing figures' % (figure_stats['bytes_freed'] / 1e6))
         if verbose <= 1:
             print('\n ###################### AUTO VISUALIZATION Completed ########################')
         return dft
-
-
-#############################################################################################
-
-
-# Create a new class FixDQ by inheriting from Fix_DQ
-class FixDQ(Fix_DQ):
-    """
-    FixDQ is a great way to clean an entire train data set and apply the same steps in 
-    an MLOps pipeline to a test dataset. FixDQ can be used to detect most issues in 
-    your data (similar to data_cleaning_suggestions but without the `target` 
-    related issues) in one step. Then it fixes those issues it finds during the 
-    `fit` method by the `transform` method. This transformer can then be saved 
-    (or "pickled") for applying the same steps on test data either at the same 
-    time or later.
-
-    FixDQ will perform following data quality cleaning steps:
-        It removes ID columns from further processing
-        It removes zero-variance columns from further processing
-        It identifies rare categories and groups them into a single category 
-                    called "Rare"
-        It finds infinite values and replaces them with an upper bound based on 
-                    Inter Quartile Range
-        It detects mixed data types and drops those mixed-type columns from 
-                    further processing
-        It detects outliers and suggests to remove them or use robust statistics.
-        It detects high cardinality features but leaves them as it is.
-        It detects highly correlated features and drops one of them (whichever 
-                    comes first in the column sequence)
-        It detects duplicate rows and drops one of them or keeps only one copy 
-                    of duplicate rows
-        It detects duplicate columns and drops one of them or keeps only one copy
-        It detects skewed distributions and applies log or box-cox 
-                    transformations on them.
-        It detects imbalanced classes and leaves them as it is
-        It detects feature leakage and drops one of those features if 
-                    they are highly correlated to target
-    """
-
-    def __init__(self, quantile=0.87, cat_fill_value='missing',
-                 num_fill_value=9999, rare_threshold=0.01,
-                 correlation_threshold=0.9):
-        super().__init__()  # Call the parent class constructor
-        # Additional initialization code here
-        self.quantile = quantile
-        self.cat_fill_value = cat_fill_value
-        self.num_fill_value = num_fill_value
-        self.rare_threshold = rare_threshold
-        self.correlation_threshold = correlation_threshold
-
-
-###################################################################################
-
-
-def data_cleaning_suggestions(df, target=None):
-    """
-    This is a simple program to give data cleaning and improvement suggestions in class AV.
-    Make sure you send in a dataframe. Otherwise, this will give an error.
-    """
-    if isinstance(df, pd.DataFrame):
-        dqr = dq_report(data=df, target=target, html=False, csv_engine="pandas", verbose=1)
-    else:
-        print("Input must be a dataframe. Please check input and try again.")
-    return dqr
 ###################################################################################
@@ -0,0 +1,68 @@
+#################################################################################################
+#### The data quality tools only need pandas and pandas_dq (which loads sklearn and scipy). They are
+#### kept apart from AutoViz_Class so that "from autoviz import FixDQ" does not load the plotting stack.
+import pandas as pd
+from pandas_dq import Fix_DQ, dq_report
+#################################################################################################
+
+
+# Create a new class FixDQ by inheriting from Fix_DQ
+class FixDQ(Fix_DQ):
+    """
+    FixDQ is a great way to clean an entire train data set and apply the same steps in 
+    an MLOps pipeline to a test dataset. FixDQ can be used to detect most issues in 
+    your data (similar to data_cleaning_suggestions but without the `target` 
+    related issues) in one step. Then it fixes those issues it finds during the 
+    `fit` method by the `transform` method. This transformer can then be saved 
+    (or "pickled") for applying the same steps on test data either at the same 
+    time or later.
+
+    FixDQ will perform following data quality cleaning steps:
+        It removes ID columns from further processing
+        It removes zero-variance columns from further processing
+        It identifies rare categories and groups them into a single category 
+                    called "Rare"
+        It finds infinite values and replaces them with an upper bound based on 
+                    Inter Quartile Range
+        It detects mixed data types and drops those mixed-type columns from 
+                    further processing
+        It detects outliers and suggests to remove them or use robust statistics.
+        It detects high cardinality features but leaves them as it is.
+        It detects highly correlated features and drops one of them (whichever 
+                    comes first in the column sequence)
+        It detects duplicate rows and drops one of them or keeps only one copy 
+                    of duplicate rows
+        It detects duplicate columns and drops one of them or keeps only one copy
+        It detects skewed distributions and applies log or box-cox 
+                    transformations on them.
+        It detects imbalanced classes and leaves them as it is
+        It detects feature leakage and drops one of those features if 
+                    they are highly correlated to target
+    """
+
+    def __init__(self, quantile=0.87, cat_fill_value='missing',
+                 num_fill_value=9999, rare_threshold=0.01,
+                 correlation_threshold=0.9):
+        super().__init__()  # Call the parent class constructor
+        # Additional initialization code here
+        self.quantile = quantile
+        self.cat_fill_value = cat_fill_value
+        self.num_fill_value = num_fill_value
+        self.rare_threshold = rare_threshold
+        self.correlation_threshold = correlation_threshold
+
+
+###################################################################################
+
+
+def data_cleaning_suggestions(df, target=None):
+    """
+    This is a simple program to give data cleaning and improvement suggestions in class AV.
+    Make sure you send in a dataframe. Otherwise, this will give an error.
+    """
+    if isinstance(df, pd.DataFrame):
+        dqr = dq_report(data=df, target=target, html=False, csv_engine="pandas", verbose=1)
+    else:
+        print("Input must be a dataframe. Please check input and try again.")
+    return dqr
+###################################################################################
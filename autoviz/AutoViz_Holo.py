@@ -1,6 +1,8 @@
 from holoviews.ipython import display
 
-from autoviz.AutoViz_Utils import classify_print_vars, find_remove_duplicates
+from autoviz.AutoViz_Utils import classify_print_vars, find_remove_duplicates, use_density, finite_pairs
+from autoviz.AutoViz_Utils import correlation_matrix, average_nums_by_cat, decimate_frame, aggregate_time_series
+from autoviz.classify_method import parse_date_column
 import numpy as np
 import pandas as pd
 import warnings
@@ -142,7 +144,7 @@ def display_server(dmap):
 ##############################  This is the beginning of the new AutoViz_Holo ###################
 def AutoViz_Holo(filename, sep=',', depVar='', header=0, verbose=0,
                  lowess=False, chart_format='svg', max_rows_analyzed=150000,
-                 max_cols_analyzed=30, save_plot_dir=None):
+                 max_cols_analyzed=30, save_plot_dir=None, density_threshold=20000):
     """
     ##############################################################################
     ##### AUTOVIZ_HOLO PERFORMS AUTO VISUALIZATION OF ANY DATA SET USING BOKEH. ##
@@ -211,7 +213,7 @@ def AutoViz_Holo(filename, sep=',', depVar='', header=0, verbose=0,
         ### You can draw pair scatters only if there are 2 or more numeric variables ####
         if len(nums) >= 2:
             drawobj2 = draw_pair_scatters_hv(dfin, nums, problem_type, chart_format, dep,
-                                             classes, lowess, mk_dir, verbose)
+                                             classes, lowess, mk_dir, verbose, density_threshold)
             ls_objects.append(drawobj2)
     drawobj3 = draw_distplot_hv(dfin, cats, nums, chart_format, problem_type, dep, classes, mk_dir, verbose)
     ls_objects.append(drawobj3)
@@ -251,7 +253,7 @@ def draw_cat_vars_hv(dfin, dep, nums, cats, chart_format, problem_type, mk_dir,
     ensure_hvplot_imported()
     ######## SCATTER PLOTS ARE USEFUL FOR COMPARING NUMERIC VARIABLES
     ##### we are going to modify dfin and classes, so we are making copies to make changes
-    dft = copy.deepcopy(dfin)
+    dft = dfin[:]
     image_count = 0
     imgdata_list = list()
     N = len(nums)
@@ -292,6 +294,7 @@ def draw_cat_vars_hv(dfin, dep, nums, cats, chart_format, problem_type, mk_dir,
     ### The X axis should be cat vars and the Y axis should be numeric vars ######
     x = pnw.Select(name='X-Axis', value=cats[0], options=cats)
     y = pnw.Select(name='Y-Axis', value=quantileable[0], options=quantileable)
+    averages = average_nums_by_cat(dft, cats, quantileable)
 
     # you need to decorate this function with depends to make the widgets change axes real time ##
     @pn.depends(x.param.value, y.param.value)
@@ -305,7 +308,7 @@ def draw_cat_vars_hv(dfin, dep, nums, cats, chart_format, problem_type, mk_dir,
         opts['tools'] = ['hover']
         opts['toolbar'] = 'above'
         opts['colorbar'] = True
-        conti_df = dft[[x, figure_y]].groupby(x).mean().reset_index()
+        conti_df = averages[x][[figure_y]].reset_index()
         return hv.Bars(conti_df).opts(**opts)
 
     widgets = pn.WidgetBox(x, y)
@@ -331,7 +334,7 @@ def draw_cat_vars_hv(dfin, dep, nums, cats, chart_format, problem_type, mk_dir,
 #####################################################################################################
 def draw_kdeplot_hv(dfin, cats, nums, chart_format, problem_type, dep, ls_objects, mk_dir, verbose=0):
     ensure_hvplot_imported()
-    dft = copy.deepcopy(dfin)
+    dft = dfin[:]
     image_count = 0
     imgdata_list = list()
     N = len(nums)
@@ -401,7 +404,7 @@ def draw_scatters_hv(dft, nums, chart_format, problem_type,
     ensure_hvplot_imported()
     ######## SCATTER PLOTS ARE USEFUL FOR COMPARING NUMERIC VARIABLES
     ##### we are going to modify dfin and classes, so we are making copies to make changes
-    dft = copy.deepcopy(dft)
+    dft = dft[:]
     image_count = 0
     imgdata_list = list()
     classes = copy.deepcopy(classes)
@@ -495,8 +498,27 @@ def draw_scatters_hv(dft, nums, chart_format, problem_type,
 
 
 #######################################################################################
+def density_image_hv(dft, x, y, width_size, height_size, bins=100):
+    """
+    Returns a 2-D histogram of two numeric columns as a HoloViews Image. Unlike hv.Points,
+    its size depends only on the number of bins, not on the number of rows in dft.
+    """
+    xs, ys, _ = finite_pairs(dft[x], dft[y])
+    counts, xedges, yedges = np.histogram2d(xs, ys, bins=bins)
+    xcenters = (xedges[:-1] + xedges[1:]) / 2
+    ycenters = (yedges[:-1] + yedges[1:]) / 2
+    #### empty bins are left blank: a log color scale cannot show zero counts
+    counts = np.where(counts > 0, counts, np.nan)
+    return hv.Image((xcenters, ycenters, counts.T), kdims=['x', 'y'], vdims=['count'],
+                    label="%s vs %s" % (x.title(), y.title())).opts(
+        cmap='viridis', logz=True, width=width_size, height=height_size, xlabel=x, ylabel=y,
+        tools=['hover'], toolbar='above', colorbar=True,
+        title='Pair-wise Density of two Independent Numeric variables')
+
+
 def draw_pair_scatters_hv(dfin, nums, problem_type, chart_format, dep=None,
-                          classes=None, lowess=False, mk_dir='AutoViz_Plots', verbose=0):
+                          classes=None, lowess=False, mk_dir='AutoViz_Plots', verbose=0,
+                          density_threshold=20000):
     """
     #### PAIR SCATTER PLOTS ARE NEEDED ONLY FOR CLASSIFICATION PROBLEMS IN NUMERIC VARIABLES
     ### This is where you plot a pair-wise scatter plot of Independent Variables against each other####
@@ -552,6 +574,8 @@ def draw_pair_scatters_hv(dfin, nums, problem_type, chart_format, dep=None,
         ## you need to decorate this function with depends to make the widgets change axes real time ##
         @pn.depends(x.param.value, y.param.value, color.param.value)
         def create_figure(x, figure_y, figure_color):
+            if use_density(len(dft), density_threshold):
+                return density_image_hv(dft, x, figure_y, width_size, height_size)
             figure_opts = dict(cmap=cmap_list[0], width=width_size, height=height_size, line_color='black')
             if figure_color != 'None':
                 figure_opts['color'] = figure_color
@@ -599,6 +623,8 @@ def draw_pair_scatters_hv(dfin, nums, problem_type, chart_format, dep=None,
 
         @pn.depends(x.param.value, y.param.value, color.param.value)
         def create_figure(x, figure_y, figure_color):
+            if use_density(len(dft), density_threshold):
+                return density_image_hv(dft, x, figure_y, width_size, height_size)
             figure_opts = dict(cmap=cmap_list[0], width=width_size, height=height_size, line_color='black')
             if figure_color != 'None':
                 figure_opts['color'] = figure_color
@@ -647,7 +673,7 @@ def draw_pair_scatters_hv(dfin, nums, problem_type, chart_format, dep=None,
 def draw_distplot_hv(dft, cats, conti, chart_format, problem_type, dep=None,
                      classes=None, mk_dir='AutoViz_Plots', verbose=0):
     ensure_hvplot_imported()
-    dft = copy.deepcopy(dft)
+    dft = dft[:]
     image_count = 0
     imgdata_list = list()
     #### Since we are making changes to dft and classes, we will be making copies of it here
@@ -881,7 +907,7 @@ def draw_distplot_hv(dft, cats, conti, chart_format, problem_type, dep=None,
 def draw_violinplot_hv(dft, dep, nums, chart_format, modeltype='Regression',
                        mk_dir='AutoViz_Plots', verbose=0):
     ensure_hvplot_imported()
-    dft = copy.deepcopy(dft)
+    dft = dft[:]
     image_count = 0
     imgdata_list = list()
     width_size = 800
@@ -1019,7 +1045,7 @@ def draw_date_vars_hv(df, dep, datevars, nums, chart_format, modeltype='Regressi
     ensure_hvplot_imported()
     #### Now you want to display 2 variables at a time to see how they change over time
     ### Don't change the number of cols since you will have to change rows formula as well
-    df = copy.deepcopy(df)
+    df = df[:]
     imgdata_list = list()
     image_count = 0
     N = len(nums)
@@ -1052,6 +1078,7 @@ def draw_date_vars_hv(df, dep, datevars, nums, chart_format, modeltype='Regressi
 
     x = pnw.Select(name='X-Axis', value=datevars[0], options=datevars)
     y = pnw.Select(name='Y-Axis', value=quantileable[0], options=quantileable)
+    averages = dict()
 
     ## you need to decorate this function with depends to make the widgets change axes real time ##
     @pn.depends(x.param.value, y.param.value)
@@ -1067,8 +1094,14 @@ def draw_date_vars_hv(df, dep, datevars, nums, chart_format, modeltype='Regressi
         # opts['colorbar'] = True
         # opts['color'] = next(colors)
         opts['title'] = title = 'Time Series plots of Numeric vars'
-        dft = df.set_index(df[figure_x])
-        conti_df = df[[figure_x, figure_y]].set_index(df[figure_x]).drop(figure_x, axis=1)
+        #### every numeric var is averaged over time buckets of figure_x once, then only read here
+        if figure_x not in averages:
+            try:
+                averages[figure_x] = aggregate_time_series(df, parse_date_column(df[figure_x]),
+                                                           quantileable)['overall']
+            except ValueError:
+                averages[figure_x] = df[quantileable].set_index(df[figure_x])
+        conti_df = decimate_frame(averages[figure_x][[figure_y]])
         return hv.Curve(conti_df).opts(**opts)
 
     widgets = pn.WidgetBox(x, y)
@@ -1094,7 +1127,7 @@ def draw_date_vars_hv(df, dep, datevars, nums, chart_format, modeltype='Regressi
 def draw_heatmap_hv(dft, conti, chart_format, datevars:list, dep=None,
                     modeltype='Regression', classes=None, mk_dir='AutoViz_Plots', verbose=0):
     ensure_hvplot_imported()
-    dft = copy.deepcopy(dft)
+    dft = dft[:]
     ### Test if this is a time series data set, then differene the continuous vars to find
     ###  if they have true correlation to Dependent Var. Otherwise, leave them as is
     width_size = 600
@@ -1118,7 +1151,7 @@ def draw_heatmap_hv(dft, conti, chart_format, datevars:list, dep=None,
     else:
         dft = dft[:]
         try:
-            dft.index = pd.to_datetime(dft.pop(datevars[0]), infer_datetime_format=True)
+            dft.index = parse_date_column(dft.pop(datevars[0]))
             timeseries_flag = True
         except:
             if verbose == 1 and len(datevars) > 0:
@@ -1141,11 +1174,11 @@ def draw_heatmap_hv(dft, conti, chart_format, datevars:list, dep=None,
         rows = 1
         cols = 1
         if timeseries_flag:
-            dft_target = dft[[dep] + conti].diff()
+            dft_target = dft[[dep] + conti]
         else:
             dft_target = dft[conti]
             dft_target[dep] = dft[dep].values
-        corre = dft_target.corr()
+        corre = correlation_matrix(dft_target, diff=timeseries_flag)
         corre = corre.round(2)
         if timeseries_flag:
             heatmap = corre.hvplot.heatmap(height=height_size, width=width_size, colorbar=True,
@@ -1170,12 +1203,8 @@ def draw_heatmap_hv(dft, conti, chart_format, datevars:list, dep=None,
         else:
             conti += [dep]
         dft_target = dft[conti]
-        if timeseries_flag:
-            dft_target = dft_target.diff().dropna()
-        else:
-            dft_target = dft_target[:]
         N = len(conti)
-        corre = dft_target.corr()
+        corre = correlation_matrix(dft_target, diff=timeseries_flag)
         corre = corre.round(2)
         if timeseries_flag:
             heatmap = corre.hvplot.heatmap(height=height_size, width=width_size, colorbar=True,
@@ -3,12 +3,15 @@ Copyright 2020 Google LLC. This software is provided as-is, without warranty or
 representation for any use or purpose. Your use of it is subject to your
 agreement with Google.
 """
+import multiprocessing
+import numpy as np
 import pandas as pd
+import re
 import string
 
 from collections import Counter
 
-from .AutoViz_Utils import save_image_data
+from .AutoViz_Utils import save_image_data, manage_figures, process_count
 
 pd.set_option('display.max_colwidth', 5000)
 
@@ -212,10 +215,8 @@ def remove_html(text):
 
 
 # Convert Emojis to Text
-import emoji
-
-
 def convert_emojis(text):
+    import emoji
     return emoji.demojize(text)
 
 
@@ -230,18 +231,62 @@ def remove_punct(text):
 
 def remove_stopwords(tweet):
     """Removes STOP_WORDS characters"""
-    stop_words = return_stop_words()
     tweet = tweet.lower()
-    tweet = ' '.join([x for x in tweet.split(" ") if x not in stop_words])
+    tweet = ' '.join([x for x in tweet.split(" ") if x not in STOPWORDS])
     tweet = ''.join([x for x in tweet if x in string.printable])
     return tweet
 
 
+################################################################################
+#### TextBlob needs the NLTK punkt tokenizer and the wordnet corpus to lemmatize words. They are looked up
+#### on this machine once per process and never downloaded unless load_lemmatizer(download=True) is called.
+#### Without them, words are split on non-word characters and are not lemmatized.
+NLTK_RESOURCES = ['punkt', 'punkt_tab', 'wordnet', 'omw-1.4']
+nltk_resources = {'loaded': False, 'lemmatize': None}
+word_pattern = re.compile(r'\w+')
+
+
+def lemmatize_with_textblob(text):
+    from textblob import TextBlob
+    return [word.lemmatize() for word in TextBlob(text).words]
+
+
+def lemmatizer_errors():
+    """Returns the errors that mean TextBlob cannot lemmatize words on this machine."""
+    try:
+        from textblob.exceptions import TextBlobError
+    except ImportError:
+        return ImportError, LookupError
+    return ImportError, LookupError, TextBlobError
+
+
+def load_lemmatizer(download=False):
+    """
+    Returns the function that splits text into lemmas, or None if TextBlob or its NLTK resources are missing.
+    The result is cached for the process. If download is True, missing NLTK resources are downloaded first.
+    """
+    if nltk_resources['loaded'] and not (download and nltk_resources['lemmatize'] is None):
+        return nltk_resources['lemmatize']
+    nltk_resources.update(loaded=True, lemmatize=None)
+    try:
+        if download:
+            import nltk
+            for resource_name in NLTK_RESOURCES:
+                nltk.download(resource_name, quiet=True, raise_on_error=False)
+        lemmatize_with_textblob('words are lemmatized')
+    except lemmatizer_errors() as e:
+        print('    Words in wordclouds will not be lemmatized: %s' % str(e).strip().split('\n')[0])
+        return None
+    nltk_resources['lemmatize'] = lemmatize_with_textblob
+    return lemmatize_with_textblob
+
+
 # define a function that accepts text and returns a list of lemmas
 def split_into_lemmas(text):
-    words = TextBlob(text).words
-    text = ' '.join([word.lemmatize() for word in words])
-    return text
+    lemmatize = load_lemmatizer()
+    if lemmatize is None:
+        return ' '.join(word_pattern.findall(text))
+    return ' '.join(lemmatize(text))
 
 
 # Expand Slangs
@@ -542,14 +587,12 @@ def count_emojis(sentence):
 
 ################################################################################
 import re
-from wordcloud import WordCloud, STOPWORDS
 import matplotlib.pyplot as plt
-from textblob import TextBlob
 from itertools import chain
 
 replace_spaces = re.compile('[/(){}\[\]\|@,;]')
 remove_special_chars = re.compile('[^0-9a-z #+_]')
-STOPWORDS = return_stop_words()
+STOPWORDS = frozenset(return_stop_words())
 remove_ip_addr = re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b')
 
 
@@ -581,37 +624,119 @@ def clean_text(x):
     return x
 
 
-def draw_wordcloud_from_dataframe(dataframe, column):
+def clean_text_chunks(text_series, chunksize=10000, cache_size=200000):
     """
-    This handy function draws a dataframe column using Wordcloud library and nltk.
+    Cleans a Series of text strings like clean_steps followed by clean_text, chunksize rows at a time.
+    clean_steps is done with vectorised pandas string methods. Every step of clean_text works on one
+    word at a time, so it is done only once for each distinct word and remembered for the next rows
+    (up to cache_size words). Yields a Series of cleaned text for each chunk, with the same index as text_series.
+    """
+    cleaned_words = {}
+    for start in range(0, len(text_series), chunksize):
+        chunk = text_series.iloc[start:start + chunksize].fillna("missing").astype(str)
+        text = chunk.str.replace('\n', ' ', regex=False).str.lower()
+        text = text.str.replace(remove_ip_addr, '', regex=True)
+        text = text.str.replace(replace_spaces, ' ', regex=True)
+        text = text.str.replace(remove_special_chars, '', regex=True)
+        words = text.reset_index(drop=True).str.split().explode().dropna()
+        words = words[~words.isin(STOPWORDS)]
+        if len(cleaned_words) > cache_size:
+            cleaned_words.clear()
+        for word in words.unique():
+            if word not in cleaned_words:
+                cleaned_words[word] = clean_text(word)
+        words = words.map(cleaned_words)
+        words = words[words != '']
+        cleaned = words.groupby(level=0).agg(' '.join).reindex(range(len(chunk)), fill_value='')
+        cleaned.index = chunk.index
+        yield cleaned
+
+
+def clean_text_column(text_series, chunksize=10000):
+    """
+    Returns text_series cleaned by clean_text_chunks as one Series.
     """
+    if len(text_series) == 0:
+        return pd.Series([], index=text_series.index, dtype=object)
+    return pd.concat(list(clean_text_chunks(text_series, chunksize)))
 
-    ### Remember that fillna only works at dataframe level! ##
-    X_train = dataframe[[column]].fillna("missing")
-    ### Map function only works on Series, so you should use this ###
-    X_train = X_train[column].map(clean_steps)
-    ### next time, you get back a series, so just use it as is ###
-    X_train = X_train.map(clean_text)
 
-    # Dictionary of all words from train corpus with their counts.
+def merge_word_counts(words_counts, new_counts, capacity=100000):
+    """
+    Adds new_counts to the Counter words_counts and keeps at most capacity words in it (Misra-Gries summary).
+    When there are too many words, the count of the (capacity + 1)th most frequent word is subtracted from
+    every count and the words left without a count are dropped. Any word that is more frequent than
+    1 / (capacity + 1) of all words is kept, and counts are too low by at most that much.
+    """
+    words_counts.update(new_counts)
+    if len(words_counts) <= capacity:
+        return words_counts
+    counts = np.fromiter(words_counts.values(), dtype=np.int64, count=len(words_counts))
+    threshold = np.partition(counts, -(capacity + 1))[-(capacity + 1)]
+    return Counter({word: count - threshold for word, count in words_counts.items() if count > threshold})
+
 
-    ### Fantastic way to count words using one line of code #############
-    ###  Thanks to : https://stackoverflow.com/questions/35857519/efficiently-count-word-frequencies-in-python
-    words_counts = Counter(chain.from_iterable(map(str.split, X_train)))
-    vocab_size = 50000
-    top_words = sorted(words_counts, key=words_counts.get, reverse=True)[:vocab_size]
-    text_join = ' '.join(top_words)
+def count_words(text_series, chunksize=10000, capacity=100000):
+    """
+    Cleans text_series with clean_text_chunks and returns a Counter of its most frequent words.
+    The text is counted one chunk at a time and at most capacity words are kept (see merge_word_counts).
+    """
+    words_counts = Counter()
+    for cleaned in clean_text_chunks(text_series, chunksize):
+        ###  Thanks to : https://stackoverflow.com/questions/35857519/efficiently-count-word-frequencies-in-python
+        chunk_counts = Counter(chain.from_iterable(map(str.split, cleaned)))
+        words_counts = merge_word_counts(words_counts, chunk_counts, capacity)
+    return words_counts
 
-    # picture_mask = plt.imread('test.png')
 
+def count_words_by_class(text_series, target_series, chunksize=10000, capacity=100000):
+    """
+    Cleans text_series once and counts its words separately for each value of target_series.
+    Returns a dictionary of a Counter of the most frequent words for each target value.
+    """
+    target_values = target_series.values
+    words_counts = {}
+    for cleaned in clean_text_chunks(text_series.reset_index(drop=True), chunksize):
+        words = cleaned.str.split().explode().dropna()
+        counts = words.groupby([target_values[words.index], words.values]).size()
+        chunk_counts = {}
+        for (target, word), count in counts.items():
+            chunk_counts.setdefault(target, Counter())[word] = count
+        for target, target_counts in chunk_counts.items():
+            words_counts[target] = merge_word_counts(words_counts.get(target, Counter()), target_counts, capacity)
+    return words_counts
+
+
+def wordcloud_image(words_counts, vocab_size=50000):
+    """
+    Draws a wordcloud of the vocab_size most frequent words in words_counts and returns it as an image array.
+    """
+    from wordcloud import WordCloud
     wordcloud1 = WordCloud(
-        stopwords=STOPWORDS,
         background_color='white',
         width=1800,
         height=1400,
-        # mask=picture_mask
-    ).generate(text_join)
-    return wordcloud1
+        # mask=plt.imread('test.png')
+    ).generate_from_frequencies(dict(words_counts.most_common(vocab_size)))
+    return wordcloud1.to_array()
+
+
+def wordcloud_images(words_counts_list, n_jobs=1):
+    """
+    Draws a wordcloud image for each Counter in words_counts_list, in up to n_jobs forked processes.
+    """
+    n_jobs = process_count(n_jobs, len(words_counts_list))
+    if n_jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context('fork').Pool(n_jobs) as pool:
+            return pool.map(wordcloud_image, words_counts_list, chunksize=1)
+    return [wordcloud_image(words_counts) for words_counts in words_counts_list]
+
+
+def draw_wordcloud_from_dataframe(dataframe, column):
+    """
+    This handy function draws a dataframe column using Wordcloud library and nltk.
+    """
+    return wordcloud_image(count_words(dataframe[column]))
 
 
 ################################################################################
@@ -626,8 +751,9 @@ def find_remove_duplicates(values):
     return output
 
 
+@manage_figures
 def draw_word_clouds(dft, each_string_var, chart_format, plotname,
-                     dep, problem_type, classes, mk_dir, verbose=0):
+                     dep, problem_type, classes, mk_dir, verbose=0, n_jobs=1):
     dft = dft[:]
     width_size = 20
     height_size = 10
@@ -662,17 +788,16 @@ def draw_word_clouds(dft, each_string_var, chart_format, plotname,
         fig = plt.figure(figsize=(min(num_plots * width_size, 20), min(num_plots * height_size, 20)))
         cols = 2
         rows = int(num_plots / cols + 0.5)
+        #### the text is cleaned and counted once for all classes: then their wordclouds are drawn in parallel ###
+        words_counts = count_words_by_class(dft[each_string_var], dft[dep])
+        images = wordcloud_images([words_counts.get(target, Counter()) for target in target_vars[:num_plots]],
+                                  n_jobs)
         plotc = 1
         while plotc <= num_plots:
             plt.subplot(rows, cols, plotc)
             ax1 = plt.gca()
             ax1.axis("off")
-            dft_target = dft.loc[(dft[dep] == target_vars[plotc - 1])][each_string_var]
-            if isinstance(dft_target, pd.Series):
-                wc1 = draw_wordcloud_from_dataframe(pd.DataFrame(dft_target), each_string_var)
-            else:
-                wc1 = draw_wordcloud_from_dataframe(dft_target, each_string_var)
-            ax1.imshow(wc1)
+            ax1.imshow(images[plotc - 1])
             ax1.set_title('Wordcloud for %s, target=%s' % (each_string_var, target_vars[plotc - 1]), fontsize=20)
             plotc += 1
         fig.tight_layout()
@@ -685,3 +810,4 @@ def draw_word_clouds(dft, each_string_var, chart_format, plotname,
         if verbose <= 1:
             plt.show()
     ####### End of Word Clouds #############################
+    return imgdata_list
@@ -40,8 +40,9 @@ import matplotlib
 
 matplotlib.use('agg')
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+from matplotlib.lines import Line2D
 # from matplotlib import io
-import io
 import seaborn as sns
 
 # sns.set(style="whitegrid", color_codes=True)
@@ -50,43 +51,253 @@ import pprint
 matplotlib.style.use('fivethirtyeight')
 from itertools import cycle, combinations
 import sys
+import traceback
 from io import BytesIO
 import base64
-from sklearn.model_selection import train_test_split
-from .classify_method import classify_columns
+from .classify_method import classify_columns, profile_columns, parse_date_column
+import contextlib
+import functools
+import gc
+import inspect
+import json
+import multiprocessing
+import time
+import tracemalloc
+try:
+    import resource
+except ImportError:
+    ### resource is not available on Windows: peak RSS is not measured there
+    resource = None
+
+
+#### With pandas copy-on-write, slices such as dft[:] share memory with the data frame they came
+#### from and a column is copied only when a function changes it. pandas 3 always works this way.
+def copy_on_write():
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return contextlib.nullcontext()
+    try:
+        pd.get_option('mode.copy_on_write')
+    except Exception:
+        ### this pandas version does not have copy-on-write yet
+        return contextlib.nullcontext()
+    return pd.option_context('mode.copy_on_write', True)
+
+
+def share_or_copy(df):
+    """
+    Returns df[:] if pandas is copying on write right now, so that it can share memory with df safely.
+    Otherwise returns a full copy of df.
+    """
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return df[:]
+    try:
+        enabled = pd.get_option('mode.copy_on_write') is True
+    except Exception:
+        enabled = False
+    return df[:] if enabled else df.copy()
+
+
+##########################################################################################
+#### Every stage of an AutoViz run (loading, classifying, each family of plots...) is timed by stage_timer.
+#### Each stage is a dict in stage_stats with its wall and CPU time in seconds, how much the peak RSS grew in
+#### bytes, the rows and columns it worked on, and the time spent in savefig and the bytes it wrote to disk.
+stage_stats = []
+render_stats = {'savefig_time': 0.0, 'bytes_written': 0}
+
+
+def reset_stage_stats():
+    del stage_stats[:]
+    render_stats.update(savefig_time=0.0, bytes_written=0)
+
+
+def peak_rss():
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    ### ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+@contextlib.contextmanager
+def stage_timer(stage, rows=0, columns=0):
+    """
+    Times the code in the with block and adds it to stage_stats as a stage called stage.
+    The stage dict is yielded so that rows and columns can be filled in once they are known.
+    """
+    record = {'stage': stage, 'rows': rows, 'columns': columns}
+    start_wall, start_cpu, start_rss = time.perf_counter(), time.process_time(), peak_rss()
+    start_render = dict(render_stats)
+    try:
+        yield record
+    finally:
+        record['wall_time'] = time.perf_counter() - start_wall
+        record['cpu_time'] = time.process_time() - start_cpu
+        record['peak_rss_delta'] = peak_rss() - start_rss
+        record['savefig_time'] = render_stats['savefig_time'] - start_render['savefig_time']
+        record['bytes_written'] = render_stats['bytes_written'] - start_render['bytes_written']
+        stage_stats.append(record)
+
+
+def write_stage_stats(stages, filename):
+    """
+    Appends stages to filename as JSON lines, one stage per line.
+    """
+    with open(filename, 'a') as stats_file:
+        for record in stages:
+            stats_file.write(json.dumps(record, default=str) + '\n')
+
+
+##########################################################################################
+#### Plot families are independent of each other: each one draws its own figures from the same dft.
+#### Worker processes are forked so that they inherit dft from this module instead of getting a
+#### pickled copy of it with every task. Forking is only done on Linux: on macOS a process that has
+#### loaded these libraries is not safe to fork. Since XGBoost (OpenMP) has already run in the parent
+#### when the charts are drawn, workers must only draw charts and never run OpenMP code themselves:
+#### GNU OpenMP deadlocks in a forked child whose parent had started its thread pool.
+plot_task_data = None
+
+
+def run_plot_task(task, verbose=0):
+    """
+    Draws one family of plots from the shared data frame. A task is a tuple of (plot name, draw
+    function, arguments after the data frame, error message), optionally followed by the stage name
+    to time it under, which defaults to the name of the draw function. Returns the image data of the
+    plots and None, or None and the error message if drawing failed. If verbose, the traceback is printed.
+    """
+    plot_name, draw_function, args, error_message = task[:4]
+    stage = task[4] if len(task) > 4 else getattr(draw_function, '__name__', plot_name)
+    with stage_timer(stage, *plot_task_data.shape):
+        try:
+            return draw_function(plot_task_data, *args), None
+        except Exception as e:
+            if verbose:
+                traceback.print_exc()
+            return None, '%s %s' % (error_message, e)
+
+
+def run_plot_task_in_worker(task, verbose=0):
+    """
+    Runs a plot task in a worker process and also returns the stages it added to stage_stats there.
+    """
+    first_stage = len(stage_stats)
+    return run_plot_task(task, verbose), stage_stats[first_stage:]
+
+
+def process_count(n_jobs, n_tasks):
+    """
+    Returns how many processes should run n_tasks tasks: n_jobs=-1 means all CPUs, and never more
+    processes than tasks. Inside a pool worker it is always 1 since workers cannot start processes.
+    """
+    if n_jobs is None or n_jobs == 0:
+        n_jobs = 1
+    elif n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if multiprocessing.current_process().daemon:
+        return 1
+    return max(1, min(n_jobs, n_tasks))
+
+
+def run_plot_tasks(dft, plot_tasks, n_jobs=1, verbose=0):
+    """
+    Runs plot tasks on dft and returns their results in the same order as the tasks.
+    If n_jobs is more than 1, the tasks are drawn by a pool of n_jobs forked processes.
+    n_jobs=-1 uses all CPUs. Except on Linux, the tasks are always drawn one at a time.
+    """
+    global plot_task_data
+    n_jobs = process_count(n_jobs, len(plot_tasks))
+    if n_jobs > 1 and not sys.platform.startswith('linux'):
+        print('    Drawing plots in parallel is only done on Linux. Drawing plots one at a time...')
+        n_jobs = 1
+    plot_task_data = dft
+    try:
+        if n_jobs > 1:
+            with multiprocessing.get_context('fork').Pool(n_jobs) as pool:
+                results = pool.map(functools.partial(run_plot_task_in_worker, verbose=verbose), plot_tasks,
+                                   chunksize=1)
+            for _, stages in results:
+                stage_stats.extend(stages)
+            return [result for result, _ in results]
+        return [run_plot_task(task, verbose) for task in plot_tasks]
+    finally:
+        plot_task_data = None
+
 
 
 ######## This is where we store the image data in a dictionary with a list of images #########
+##########################################################################################
+#### pyplot keeps every figure alive until it is closed. Each draw function is wrapped by manage_figures
+#### which closes the figures that function opened as soon as they have been shown or saved.
+#### figure_stats counts them: bytes_freed is measured only while tracemalloc is tracing memory.
+figure_stats = {'live_figures': 0, 'figures_closed': 0, 'bytes_freed': 0}
+
+
+def reset_figure_stats():
+    figure_stats.update(live_figures=len(plt.get_fignums()), figures_closed=0, bytes_freed=0)
+
+
+def close_figures(fignums):
+    measure = tracemalloc.is_tracing()
+    if measure:
+        before = tracemalloc.get_traced_memory()[0]
+    for num in fignums:
+        plt.close(num)
+    if measure:
+        gc.collect()
+        figure_stats['bytes_freed'] += max(0, before - tracemalloc.get_traced_memory()[0])
+    figure_stats['figures_closed'] += len(fignums)
+    figure_stats['live_figures'] = len(plt.get_fignums())
+
+
+def manage_figures(draw_function):
+    """
+    Decorator for draw functions. Figures opened by the function are shown (if verbose <= 1) and
+    closed when it returns, and closed without showing them if it fails.
+    """
+    signature = inspect.signature(draw_function)
+
+    @functools.wraps(draw_function)
+    def wrapper(*args, **kwargs):
+        before = set(plt.get_fignums())
+        try:
+            result = draw_function(*args, **kwargs)
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            if arguments.arguments.get('verbose', 0) <= 1 and len(set(plt.get_fignums()) - before) > 0:
+                plt.show()
+            return result
+        finally:
+            close_figures([num for num in plt.get_fignums() if num not in before])
+
+    return wrapper
+
+
 def save_image_data(fig, chart_format, plot_name, mk_dir, additional=''):
-    if not os.path.isdir(mk_dir):
-        os.mkdir(mk_dir)
-    if additional == '':
-        filename = os.path.join(mk_dir, plot_name + "." + chart_format)
-    else:
+    """
+    Renders fig once into memory and writes those same bytes to mk_dir if mk_dir is given.
+    If mk_dir is None, nothing is written to disk. Returns the SVG text for svg charts and the
+    base64 encoded image for other formats.
+    """
+    start_time = time.perf_counter()
+    imgdata = BytesIO()
+    fig.savefig(imgdata, format=chart_format, dpi='figure')
+    image_bytes = imgdata.getvalue()
+    if mk_dir is not None:
+        if not os.path.isdir(mk_dir):
+            os.makedirs(mk_dir)
         filename = os.path.join(mk_dir, plot_name + additional + "." + chart_format)
-    ##################################################################################
+        with open(filename, 'wb') as image_file:
+            image_file.write(image_bytes)
+        render_stats['bytes_written'] += len(image_bytes)
+    render_stats['savefig_time'] += time.perf_counter() - start_time
     if chart_format == 'svg':
-        ###### You have to add these lines to each function that creates charts currently ##
-        imgdata = io.StringIO()
-        fig.savefig(filename, dpi='figure', format=chart_format)
-        imgdata.seek(0)
-        svg_data = imgdata.getvalue()
-        return svg_data
+        return image_bytes.decode('utf-8')
     else:
-        ### You have to do it slightly differently for PNG and JPEG formats
-        imgdata = BytesIO()
-        fig.savefig(filename, format=chart_format, dpi='figure')
-        # fig.savefig(imgdata, format=chart_format, bbox_inches='tight', pad_inches=0.0)
-        imgdata.seek(0)
-        figdata_png = base64.b64encode(imgdata.getvalue())
-        return figdata_png
+        return base64.b64encode(image_bytes)
 
 
 #### This module analyzes a dependent Variable and finds out whether it is a
 #### Regression or Classification type problem
 def analyze_problem_type(train, target, verbose=0):
-    train = copy.deepcopy(train)
-    target = copy.deepcopy(target)
     cat_limit = 30  ### this determines the number of categories to name integers as classification ##
     float_limit = 15  ### this limits the number of float variable categories for it to become cat var
 
@@ -94,25 +305,28 @@ def analyze_problem_type(train, target, verbose=0):
         target = [target]
     ### we can analyze only the first target in a multi-label to detect problem type ##
     targ = target[0]
+    #### unique() counts a missing value as one more class, so add it to the number of unique values ##
+    profile = profile_columns(train[[targ]], top_k=0).loc[targ]
+    n_classes = profile['nunique'] + (profile['null_count'] > 0)
     ####  This is where you detect what kind of problem it is #################
     if train[targ].dtype in [np.int64, np.int32, np.int16, np.int8]:
-        if len(train[targ].unique()) <= 2:
+        if n_classes <= 2:
             model_class = 'Binary_Classification'
-        elif 2 < len(train[targ].unique().tolist()) <= cat_limit:
+        elif 2 < n_classes <= cat_limit:
             model_class = 'Multi_Classification'
         else:
             model_class = 'Regression'
     elif train[targ].dtype in ['float16', 'float32', 'float64']:
-        if len(train[targ].unique()) <= 2:
+        if n_classes <= 2:
             model_class = 'Binary_Classification'
-        elif 2 < len(train[targ].unique().tolist()) <= float_limit:
+        elif 2 < n_classes <= float_limit:
             model_class = 'Multi_Classification'
         else:
             model_class = 'Regression'
     elif train[targ].dtype == bool:
         model_class = 'Binary_Classification'
     else:
-        if len(train[targ].unique().tolist()) <= 2:
+        if n_classes <= 2:
             model_class = 'Binary_Classification'
         else:
             model_class = 'Multi_Classification'
@@ -126,6 +340,7 @@ def analyze_problem_type(train, target, verbose=0):
 # Pivot Tables are generally meant for Categorical Variables on the axes
 # and a Numeric Column (typically the Dep Var) as the "Value" aggregated by Sum.
 # Let's do some pivot tables to capture some meaningful insights
+@manage_figures
 def draw_pivot_tables(dft, problem_type, verbose, chart_format, depVar='', mk_dir=None):
     #### Finally I have fixed the bugs in pivot tables due to "category" dtypes in data ##############
     plot_name = 'Bar_Plots_Cats'
@@ -135,7 +350,6 @@ def draw_pivot_tables(dft, problem_type, verbose, chart_format, depVar='', mk_di
         cats = [x for x in cats if x not in [depVar]]
     else:
         cats = [x for x in cats if x not in depVar]
-    dft = copy.deepcopy(dft)
     cmap = plt.get_cmap('jet')
     #### For some reason, the cmap colors are not working #########################
     # colormaps = ['summer', 'rainbow','viridis','inferno','magma','jet','plasma']
@@ -215,6 +429,7 @@ def draw_pivot_tables(dft, problem_type, verbose, chart_format, depVar='', mk_di
     return imgdata_list
 
 
+@manage_figures
 def draw_pivot_tables_old(dft, verbose, chart_format, depVar='', mk_dir=None):
     #### Finally I have fixed the bugs in pivot tables due to "category" dtypes in data ##############
     plot_name = 'Bar_Plots_Pivots'
@@ -327,8 +542,60 @@ def draw_pivot_tables_old(dft, verbose, chart_format, depVar='', mk_dir=None):
 
 
 # In[ ]:
+#### Above density_threshold points, each scatter panel is drawn as a 2-D histogram computed with numpy.
+#### The size of the chart and the time to draw it then depend on the number of bins, not on the rows.
+def use_density(npoints, density_threshold):
+    return density_threshold is not None and npoints > density_threshold
+
+
+def finite_pairs(x, y):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = np.isfinite(x) & np.isfinite(y)
+    return x[keep], y[keep], keep
+
+
+def draw_density_scatter(ax, x, y, bins=60, cmap='viridis'):
+    """Draws a 2-D histogram of x against y on ax instead of one marker per point."""
+    x, y, _ = finite_pairs(x, y)
+    counts, xedges, yedges = np.histogram2d(x, y, bins=bins)
+    ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts.T, 0), cmap=cmap, norm=LogNorm(),
+                  rasterized=True)
+
+
+def draw_class_density_strip(ax, target, y, bins=60, cmap='viridis'):
+    """Draws a strip of y values for each class in target as a 2-D histogram instead of jittered points."""
+    codes, uniques = pd.factorize(target)
+    codes, y, _ = finite_pairs(codes, y)
+    counts, xedges, yedges = np.histogram2d(codes, y, bins=[np.arange(len(uniques) + 1) - 0.5, bins])
+    ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts.T, 0), cmap=cmap, norm=LogNorm(),
+                  rasterized=True)
+    ax.set_xticks(range(len(uniques)))
+    ax.set_xticklabels(uniques)
+
+
+def draw_class_density_contours(ax, x, y, target, target_vars, colors, class_labels, bins=30):
+    """Draws density contours of x against y for each class in target, one color per class."""
+    x, y, keep = finite_pairs(x, y)
+    target = np.asarray(target)[keep]
+    xedges = np.histogram_bin_edges(x, bins=bins)
+    yedges = np.histogram_bin_edges(y, bins=bins)
+    xcenters = (xedges[:-1] + xedges[1:]) / 2
+    ycenters = (yedges[:-1] + yedges[1:]) / 2
+    handles = []
+    for target_var, color_val, class_label in zip(target_vars, colors, class_labels):
+        in_class = target == target_var
+        counts, _, _ = np.histogram2d(x[in_class], y[in_class], bins=[xedges, yedges])
+        if counts.max() > 1:
+            ax.contour(xcenters, ycenters, counts.T, levels=4, colors=color_val, linewidths=1)
+        handles.append(Line2D([0], [0], color=color_val, label=class_label))
+    ax.legend(handles=handles)
+
+
 # SCATTER PLOTS ARE USEFUL FOR COMPARING NUMERIC VARIABLES
-def draw_scatters(dfin, nums, verbose, chart_format, problem_type, dep=None, classes=None, lowess=False, mk_dir=None):
+@manage_figures
+def draw_scatters(dfin, nums, verbose, chart_format, problem_type, dep=None, classes=None, lowess=False, mk_dir=None,
+                  density_threshold=20000):
     plot_name = 'Scatter_Plots'
     dft = dfin[:]
     ##### we are going to modify dfin and classes, so we are making copies to make changes
@@ -367,7 +634,9 @@ def draw_scatters(dfin, nums, verbose, chart_format, problem_type, dep=None, cla
             ### Be very careful with the next line. It should be singular "subplot" ##
             ##### Otherwise, if you use the plural version "subplots" it has a different meaning!
             plt.subplot(rows, cols, plotcounter)
-            if lowess:
+            if use_density(len(dft), density_threshold):
+                draw_density_scatter(plt.gca(), dft[num], dft[dep])
+            elif lowess:
                 sns.regplot(x=dft[num], y=dft[dep], lowess=lowess, color=color_val, ax=plt.gca())
             else:
                 sns.scatterplot(x=dft[num], y=dft[dep], ax=plt.gca(), palette='dark', color=color_val)
@@ -398,8 +667,11 @@ def draw_scatters(dfin, nums, verbose, chart_format, problem_type, dep=None, cla
         for num, plotc, color_val in zip(nums, range(1, noplots + 1), colors):
             ####Strip plots are meant for categorical plots so x axis must always be depVar ##
             plt.subplot(rows, cols, plotc)
-            ### Don't change this line - it works properly now Dec 20, 2023 ####
-            sns.stripplot(data=dft, x=dep, y=num, hue=dep, ax=plt.gca(), jitter=jitter)
+            if use_density(len(dft), density_threshold):
+                draw_class_density_strip(plt.gca(), dft[dep], dft[num])
+            else:
+                ### Don't change this line - it works properly now Dec 20, 2023 ####
+                sns.stripplot(data=dft, x=dep, y=num, hue=dep, ax=plt.gca(), jitter=jitter)
             plt.xticks(rotation=30, ha='right', fontsize=9)
             plt.ylabel(num)
             plt.xlabel(dep)
@@ -416,8 +688,9 @@ def draw_scatters(dfin, nums, verbose, chart_format, problem_type, dep=None, cla
 
 
 # PAIR SCATTER PLOTS ARE NEEDED ONLY FOR CLASSIFICATION PROBLEMS IN NUMERIC VARIABLES
+@manage_figures
 def draw_pair_scatters(dfin, nums, problem_type, verbose, chart_format, dep=None, classes=None, lowess=False,
-                       mk_dir=None):
+                       mk_dir=None, density_threshold=20000):
     """
     ### This is where you plot a pair-wise scatter plot of Independent Variables against each other####
     """
@@ -452,7 +725,9 @@ def draw_pair_scatters(dfin, nums, problem_type, verbose, chart_format, dep=None
             ### Be very careful with the next line. It should be singular "subplot" ##
             ##### Otherwise, if you use the plural version "subplots" it has a different meaning!
             plt.subplot(rows, cols, plotcounter)
-            if lowess:
+            if use_density(len(dft), density_threshold):
+                draw_density_scatter(plt.gca(), dft[var1], dft[var2])
+            elif lowess:
                 sns.regplot(x=dft[var1], y=dft[var2], lowess=lowess, color=color_val, ax=plt.gca())
             else:
                 sns.scatterplot(x=dft[var1], y=dft[var2], ax=plt.gca(), palette='dark', color=color_val)
@@ -484,19 +759,25 @@ def draw_pair_scatters(dfin, nums, problem_type, verbose, chart_format, dep=None
         ### Be very careful with the next line. we have used the plural "subplots" ##
         ## In this case, you have ax as an array and you have to use (row,col) to get each ax!
         target_vars = dft[dep].unique()
+        #### the rows of each class are found once and every panel draws from them without touching dft
+        class_rows = split_by_class(np.arange(len(dft)), dft[dep])
         # colors = [cmap(i) for i in np.linspace(0, 1, number)]
         for (var1, var2), plotc in zip(combos, range(1, noplots + 1)):
-            for target_var, color_val, class_label in zip(target_vars, colors, classes):
-                # Fix color in all scatter plots for each class the same using this trick
-                color_array = np.empty(0)
-                value = dft[dep] == target_var
-                dft['color'] = np.where(value is True, color_val, 'r')
-                plt.subplot(rows, cols, plotc)
-                plt.scatter(x=dft.loc[dft[dep] == target_var][var1], y=dft.loc[dft[dep] == target_var][var2],
-                            label=class_label, color=color_val, alpha=transparent)
+            plt.subplot(rows, cols, plotc)
+            if use_density(len(dft), density_threshold):
+                draw_class_density_contours(plt.gca(), dft[var1], dft[var2], dft[dep], target_vars,
+                                            [next(colors) for _ in classes], classes)
                 plt.xlabel(var1)
                 plt.ylabel(var2)
-                plt.legend()
+                continue
+            x, y = dft[var1].to_numpy(), dft[var2].to_numpy()
+            for target_var, color_val, class_label in zip(target_vars, [next(colors) for _ in classes], classes):
+                if target_var in class_rows:
+                    plt.scatter(x=x[class_rows[target_var]], y=y[class_rows[target_var]],
+                                label=class_label, color=color_val, alpha=transparent)
+            plt.xlabel(var1)
+            plt.ylabel(var2)
+            plt.legend()
         fig.suptitle('Pair-wise Scatter Plot of all Continuous Variables', fontsize=15, y=1.01)
         # fig.tight_layout();
         if verbose == 2:
@@ -509,11 +790,28 @@ def draw_pair_scatters(dfin, nums, problem_type, verbose, chart_format, dep=None
     return imgdata_list
 
 
+#### Averages are aggregated once per categorical and then only read by the plots ####
+def average_nums_by_cat(dft, cats, num_vars):
+    """
+    Returns a dict of categorical var -> table of the mean of every numeric var in that category.
+    Each categorical is grouped only once. Vars that are not numeric are left out of the tables.
+    """
+    nums = [x for x in find_remove_duplicates(num_vars) if x in dft.columns and
+            pd.api.types.is_numeric_dtype(dft[x])]
+    averages = {}
+    for cat in find_remove_duplicates(cats):
+        averages[cat] = dft.groupby(cat)[[x for x in nums if x != cat]].mean()
+    return averages
+
+
 # Bar Plots are for 2 Categoricals and One Numeric (usually Dep Var)
-def plot_fast_average_num_by_cat(dft, cats, num_vars, verbose=0, kind="bar"):
+def plot_fast_average_num_by_cat(dft, cats, num_vars, verbose=0, kind="bar", averages=None):
     """
     Great way to plot continuous variables fast grouped by a categorical variable. Just sent them in and it will take care of the rest!
+    You can pass in the averages table from average_nums_by_cat to avoid grouping the data again.
     """
+    if averages is None:
+        averages = average_nums_by_cat(dft, cats, num_vars)
     chunksize = 20
     stringlimit = 20
     col = 2
@@ -543,11 +841,11 @@ def plot_fast_average_num_by_cat(dft, cats, num_vars, verbose=0, kind="bar"):
             try:
                 ax1 = plt.subplot(row, col, counter)
                 if kind == "bar":
-                    data = dft.groupby(cat)[each_conti].mean().sort_values(
+                    data = averages[cat][each_conti].sort_values(
                         ascending=False).head(chunksize)
                     data.plot(kind=kind, ax=ax1, color=color3)
                 elif kind == "line":
-                    data = dft.groupby(cat)[each_conti].mean().sort_index(
+                    data = averages[cat][each_conti].sort_index(
                         ascending=True).head(chunksize)
                     data.plot(kind=kind, ax=ax1, color=color3)
                 if dft[cat].dtype == object or str(dft[cat].dtype) in ['category']:
@@ -568,6 +866,7 @@ def plot_fast_average_num_by_cat(dft, cats, num_vars, verbose=0, kind="bar"):
 
 
 ################# The barplots module below calls the plot_fast_average_num_by_cat module above ###
+@manage_figures
 def draw_barplots(dft, cats, conti, problem_type, verbose, chart_format, dep='', mk_dir=None):
     cats = cats[:]
     conti = conti[:]
@@ -602,7 +901,129 @@ def draw_barplots(dft, cats, conti, problem_type, verbose, chart_format, dep='',
 
 
 ############## End of Bar Plotting ##########################################
+##### Correlations are computed here for heatmaps and for the SULO method #############
+#### Each matrix computed in a run is cached with a fingerprint of every column it used, so any later
+#### request for the same (or fewer) columns of the same data, method and differencing reuses it.
+correlation_cache = []
+max_cached_correlations = 8
+
+
+def reset_correlation_cache():
+    del correlation_cache[:]
+
+
+def column_fingerprints(data):
+    """
+    Returns a hash of the values and index of each column in data, which also depends on the order of the rows.
+    """
+    weights = np.arange(1, len(data) + 1, dtype=np.uint64)
+    return {col: int((pd.util.hash_pandas_object(data[col], index=True).values * weights).sum())
+            for col in data.columns}
+
+
+def find_cached_correlation(columns, method, diff, fingerprints):
+    for entry in correlation_cache:
+        if entry['method'] == method and entry['diff'] == diff and all(
+                entry['fingerprints'].get(col) == fingerprints[col] for col in columns):
+            return entry['matrix'].loc[columns, columns]
+    return None
+
+
+def cache_correlation(matrix, method, diff, fingerprints):
+    correlation_cache.append({'method': method, 'diff': diff, 'fingerprints': fingerprints, 'matrix': matrix})
+    del correlation_cache[:-max_cached_correlations]
+
+
+def correlation_chunks(df, columns, method='pearson', diff=False, chunksize=100000):
+    """
+    Yields the values of columns in df as float32 arrays of chunksize rows at a time, differenced if diff
+    is True. Each chunk is copied from df on its own. method='spearman' yields ranks instead: ranking
+    needs whole columns, so the ranked columns are computed once before they are chunked.
+    """
+    if method == 'spearman':
+        data = df[columns].diff() if diff else df[columns]
+        df, diff = data.rank(), False
+    for row in range(0, len(df), chunksize):
+        if diff and row > 0:
+            ### the row before the chunk is needed to difference its first row
+            chunk = df.iloc[row - 1:row + chunksize][columns].diff().iloc[1:]
+        else:
+            chunk = df.iloc[row:row + chunksize][columns]
+            if diff:
+                chunk = chunk.diff()
+        yield chunk.to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def correlation_blocks(df, columns, method='pearson', diff=False, block_size=1024, chunksize=100000):
+    """
+    Yields the correlations of every column in columns with block_size of them at a time, as
+    (first column of the block, float32 array of shape len(columns) x block). Like DataFrame.corr, each
+    pair of columns uses the rows where both have values. Only chunksize rows of df are copied at a time:
+    a first pass over the chunks finds the mean of every column, then for every block the sums, sums of
+    squares and cross-products of the centered chunks are accumulated in float32.
+    If diff is True, the correlations are of the differenced columns. method='spearman' correlates ranks.
+    """
+    n_vars = len(columns)
+    totals = np.zeros(n_vars)
+    counts = np.zeros(n_vars)
+    for values in correlation_chunks(df, columns, method, diff, chunksize):
+        totals += np.nansum(values, axis=0)
+        counts += (~np.isnan(values)).sum(axis=0)
+    means = (totals / np.maximum(counts, 1)).astype(np.float32)
+    for start in range(0, n_vars, block_size):
+        stop = min(start + block_size, n_vars)
+        shape = (n_vars, stop - start)
+        count, sum_x, sum_y, sum_xx, sum_yy, sum_xy = [np.zeros(shape, dtype=np.float32) for _ in range(6)]
+        for x in correlation_chunks(df, columns, method, diff, chunksize):
+            missing = np.isnan(x)
+            x -= means
+            x[missing] = 0
+            y = x[:, start:stop]
+            sum_xy += x.T @ y
+            if missing.any():
+                present_x = (~missing).astype(np.float32)
+                present_y = present_x[:, start:stop]
+                count += present_x.T @ present_y
+                sum_x += x.T @ present_y
+                sum_y += present_x.T @ y
+                sum_xx += (x * x).T @ present_y
+                sum_yy += present_x.T @ (y * y)
+            else:
+                count += len(x)
+                sum_x += x.sum(axis=0)[:, None]
+                sum_y += y.sum(axis=0)[None, :]
+                sum_xx += (x * x).sum(axis=0)[:, None]
+                sum_yy += (y * y).sum(axis=0)[None, :]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = count * sum_xy - sum_x * sum_y
+            variance = (count * sum_xx - sum_x * sum_x) * (count * sum_yy - sum_y * sum_y)
+            block = covariance / np.sqrt(variance)
+        block[~(variance > 0)] = np.nan
+        block = np.clip(block, -1, 1)
+        ### each column is perfectly correlated with itself, unless it is constant
+        diagonal = (np.arange(start, stop), np.arange(stop - start))
+        block[diagonal] = np.where(np.isnan(block[diagonal]), np.nan, 1)
+        yield start, block
+
+
+def correlation_matrix(df, columns=None, method='pearson', diff=False):
+    """
+    Returns the correlation matrix of columns in df as a float32 DataFrame and caches it for this run.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    fingerprints = column_fingerprints(df[columns])
+    matrix = find_cached_correlation(columns, method, diff, fingerprints)
+    if matrix is None:
+        matrix = np.empty((len(columns), len(columns)), dtype=np.float32)
+        for start, block in correlation_blocks(df, columns, method, diff):
+            matrix[:, start:start + block.shape[1]] = block
+        matrix = pd.DataFrame(matrix, index=columns, columns=columns)
+        cache_correlation(matrix, method, diff, fingerprints)
+    return matrix
+
+
 ##### Draw a Heatmap using Pearson Correlation #########################################
+@manage_figures
 def draw_heatmap(dft, conti, verbose, chart_format, datevars: list, dep=None,
                  modeltype='Regression', mk_dir=None):
     ### Test if this is a time series data set, then differene the continuous vars to find
@@ -620,7 +1041,7 @@ def draw_heatmap(dft, conti, verbose, chart_format, datevars: list, dep=None,
     elif len(datevars) > 0:
         dft = dft[:]
         try:
-            dft.index = pd.to_datetime(dft.pop(datevars[0]), infer_datetime_format=True)
+            dft.index = parse_date_column(dft.pop(datevars[0]))
             timeseries_flag = True
         except:
             if verbose >= 1 and len(datevars) > 0:
@@ -630,8 +1051,10 @@ def draw_heatmap(dft, conti, verbose, chart_format, datevars: list, dep=None,
     imgdata_list = list()
     if modeltype.endswith('Classification'):
         ########## This is for Classification problems only ###########
-        if dft[dep].dtype == object or dft[dep].dtype == np.int64:
-            dft[dep] = dft[dep].factorize()[0]
+        #### factorize a copy of the target only: the data frame itself is shared with other charts
+        target = dft[dep]
+        if target.dtype == object or target.dtype == np.int64:
+            target = pd.Series(target.factorize()[0], index=dft.index, name=dep)
         image_count = 0
         N = len(conti)
         fig = plt.figure(figsize=(min(N * width_size, 20), min(N * height_size, 20)))
@@ -645,11 +1068,11 @@ def draw_heatmap(dft, conti, verbose, chart_format, datevars: list, dep=None,
         rows = 1
         cols = 1
         if timeseries_flag:
-            dft_target = dft[[dep] + conti].diff()
+            dft_target = pd.concat([target, dft[conti]], axis=1)
         else:
             dft_target = dft[conti]
-            dft_target[dep] = dft[dep].values
-        corr = dft_target.corr()
+            dft_target[dep] = target.values
+        corr = correlation_matrix(dft_target, diff=timeseries_flag)
         plt.subplot(rows, cols, plotc)
         ax1 = plt.gca()
         sns.heatmap(corr, annot=True, ax=ax1)
@@ -667,15 +1090,11 @@ def draw_heatmap(dft, conti, verbose, chart_format, datevars: list, dep=None,
         if dep is None or dep == '':
             pass
         else:
-            conti += [dep]
+            conti = conti + [dep]
         dft_target = dft[conti]
-        if timeseries_flag:
-            dft_target = dft_target.diff().dropna()
-        else:
-            dft_target = dft_target[:]
         N = len(conti)
         fig = plt.figure(figsize=(min(20, N * width_size), min(20, N * height_size)))
-        corr = dft_target.corr()
+        corr = correlation_matrix(dft_target, diff=timeseries_flag)
         sns.heatmap(corr, annot=True)
         if timeseries_flag:
             fig.suptitle('Time Series Data: Heatmap of Differenced Continuous vars including target = %s' % dep,
@@ -693,12 +1112,106 @@ def draw_heatmap(dft, conti, verbose, chart_format, datevars: list, dep=None,
     ############# End of Heat Maps ##############
 
 
-##### Draw the Distribution of each variable using Distplot
-##### Must do this only for Continuous Variables
-from scipy.stats import probplot
+##### Distributions are summarised before they are drawn, so drawing them takes the same time for any number of rows.
+#### KDEs are binned onto a fixed grid and smoothed with an FFT, box plots come from one np.percentile call
+#### per column and probability plots use a random sample of the values.
+kde_grid_size = 256
+max_sample_size = 5000
+max_fliers = 200
+
+
+def finite_values(values):
+    values = np.asarray(values, dtype=float)
+    return values[np.isfinite(values)]
+
+
+def binned_kde(values, grid_size=kde_grid_size, cut=3):
+    """
+    Returns (grid, density) of a Gaussian KDE of values with Scott's bandwidth, like seaborn's kdeplot.
+    The values are linearly binned onto grid_size points that reach cut bandwidths past the data and
+    the bins are convolved with the kernel using an FFT. Returns None if values have no spread.
+    """
+    values = finite_values(values)
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if std == 0 or not np.isfinite(std):
+        return None
+    bandwidth = std * n ** (-1 / 5.)
+    grid = np.linspace(values.min() - cut * bandwidth, values.max() + cut * bandwidth, grid_size)
+    delta = grid[1] - grid[0]
+    position = (values - grid[0]) / delta
+    left = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+    weight = position - left
+    counts = np.bincount(left, 1 - weight, minlength=grid_size) + np.bincount(left + 1, weight, minlength=grid_size)
+    offsets = np.arange(-(grid_size - 1), grid_size) * delta
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    size = 1 << int(np.ceil(np.log2(len(counts) + len(kernel) - 1)))
+    smoothed = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    density = np.maximum(smoothed[grid_size - 1:2 * grid_size - 1], 0) / n
+    return grid, density
+
+
+def box_statistics(values, whis=1.5, label=None):
+    """
+    Returns the statistics of a box plot of values as a dict for matplotlib's Axes.bxp. The quartiles come
+    from one np.percentile call. Only up to max_fliers fliers are kept, evenly spaced from lowest to highest.
+    """
+    values = finite_values(values)
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    fliers = np.sort(values[(values < low) | (values > high)])
+    if len(fliers) > max_fliers:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).astype(np.int64)]
+    stats = {'mean': values.mean(), 'med': median, 'q1': q1, 'q3': q3, 'fliers': fliers,
+             'whislo': inside.min() if len(inside) else q1, 'whishi': inside.max() if len(inside) else q3}
+    if label is not None:
+        stats['label'] = label
+    return stats
+
+
+def violin_statistics(values, grid_size=kde_grid_size):
+    """
+    Returns the statistics of a violin of values as a dict for matplotlib's Axes.violin, using binned_kde.
+    """
+    values = finite_values(values)
+    kde = binned_kde(values, grid_size)
+    if kde is None:
+        return None
+    return {'coords': kde[0], 'vals': kde[1], 'mean': values.mean(), 'median': np.median(values),
+            'min': values.min(), 'max': values.max()}
+
+
+def sample_values(values, sample_size=max_sample_size, seed=1):
+    """
+    Returns a random sample of sample_size of the finite values, or all of them if there are fewer.
+    """
+    values = finite_values(values)
+    if len(values) <= sample_size:
+        return values
+    return np.random.default_rng(seed).choice(values, sample_size, replace=False)
+
 
+def split_by_class(values, target):
+    """
+    Returns a dict of class -> values of that class, sorting the rows by class only once.
+    """
+    codes, classes = pd.factorize(target, sort=True)
+    order = np.argsort(codes, kind='stable')
+    sizes = np.bincount(codes[codes >= 0], minlength=len(classes))
+    starts = np.count_nonzero(codes < 0)
+    values = np.asarray(values)[order]
+    bounds = starts + np.concatenate([[0], np.cumsum(sizes)])
+    return {cls: values[bounds[i]:bounds[i + 1]] for i, cls in enumerate(classes)}
 
+
+##### Draw the Distribution of each variable using Distplot
+##### Must do this only for Continuous Variables
+@manage_figures
 def draw_distplot(dft, cat_bools, conti, verbose, chart_format, problem_type, dep=None, classes=None, mk_dir=None):
+    from scipy.stats import probplot
     cats = find_remove_duplicates(cat_bools)  ### first make sure there are no duplicates in this ###
     copy_cats = copy.deepcopy(cats)
     conti = copy.deepcopy(conti)
@@ -745,10 +1258,12 @@ def draw_distplot(dft, cat_bools, conti, verbose, chart_format, problem_type, de
                     ax=ax1, color=color1)
                 k += 1
                 ax2 = plt.subplot(rows, cols, k)
-                sns.boxplot(dft[each_conti], ax=ax2, color=color1)
+                box = box_statistics(dft[each_conti])
+                if box is not None:
+                    ax2.bxp([box], vert=False, patch_artist=True, boxprops={'facecolor': color1})
                 k += 1
                 ax3 = plt.subplot(rows, cols, k)
-                probplot(dft[each_conti], plot=ax3)
+                probplot(sample_values(dft[each_conti]), plot=ax3)
                 k += 1
                 skew_val = round(dft[each_conti].skew(), 1)
                 ax2.set_yticklabels([])
@@ -864,30 +1379,21 @@ def draw_distplot(dft, cat_bools, conti, verbose, chart_format, problem_type, de
                 # ax1.set_xticklabels(labels,**kwds);
                 ax1.set_title('Distribution of %s (top %d categories only)' % (each_conti, width_size))
             else:
-
+                #### each class is split out once and drawn from its histogram and binned KDE
+                class_values = split_by_class(dft[each_conti], dft[dep])
                 for target_var, color2, class_label in zip(target_vars, color_list, classes):
                     try:
+                        values = finite_values(class_values[target_var])
+                        kde = binned_kde(values)
                         if legend_flag <= label_limit:
-                            sns.histplot(dft.loc[dft[dep] == target_var][each_conti],
-                                         # hist=False,
-                                         kde=True, stat="density",
-                                         # dft.loc[dft[dep]==target_var][each_conti].hist(
-                                         #    bins=binsize, ax= ax1,
-                                         label=target_var,
-                                         color=color2,
-                                         )
+                            ax1.hist(values, bins='auto', density=True, color=color2, alpha=0.4)
+                            if kde is not None:
+                                ax1.plot(kde[0], kde[1], color=color2, label=target_var)
                             ax1.set_title('Distribution of %s' % each_conti)
                             legend_flag += 1
                         else:
-                            sns.kdeplot(dft.loc[dft[dep] == target_var][each_conti],
-                                        # hist=False,
-                                        # kde=True, stat="density",
-                                        # dft.loc[dft[dep]==target_var][each_conti].hist(
-                                        # kde=True, stat="density", linewidth=0,
-                                        #    bins=binsize, ax= ax1,
-                                        label=target_var,
-                                        color=color2,
-                                        )
+                            if kde is not None:
+                                ax1.plot(kde[0], kde[1], color=color2, label=target_var)
                             legend_flag += 1
                             ax1.set_title('Normed Histogram of %s' % each_conti)
                     except:
@@ -960,6 +1466,7 @@ def draw_distplot(dft, cat_bools, conti, verbose, chart_format, problem_type, de
 
 ##### Standardize all the variables in One step. But be careful !
 #### All the variables must be numeric for this to work !!
+@manage_figures
 def draw_violinplot(df, dep, nums, verbose, chart_format, modeltype='Regression', mk_dir=None):
     plot_name = 'Violin_Plots'
     df = df[:]
@@ -998,10 +1505,21 @@ def draw_violinplot(df, dep, nums, verbose, chart_format, modeltype='Regression'
                 fig = plt.figure(
                     figsize=(min(width_size * len(num_10), width_size), min(height_size, height_size * len(num_10))))
             ax = fig.gca()
-            # ax.set_xticklabels (df.columns, tolist(), size=10)
-            #### Don't change this line since it works to best now Dec 20, 2023 #####
-            sns.violinplot(data=df_norm, orient='v', scale='width',
-                           linewidth=3, ax=ax, inner='box')
+            #### violins are drawn from binned KDEs, each scaled to the same width, with a box plot inside
+            violins = [violin_statistics(df_norm[col]) for col in num_10]
+            positions = [i + 1 for i, violin in enumerate(violins) if violin is not None]
+            if positions:
+                parts = ax.violin([violin for violin in violins if violin is not None], positions,
+                                  showextrema=False)
+                for body, color in zip(parts['bodies'], cycle(sns.color_palette())):
+                    body.set_facecolor(color)
+                    body.set_edgecolor('black')
+                    body.set_alpha(1)
+                ax.bxp([box_statistics(df_norm[num_10[i - 1]]) for i in positions], positions, widths=0.1,
+                       showfliers=False, patch_artist=True, boxprops={'facecolor': 'black'},
+                       medianprops={'color': 'white'}, whiskerprops={'linewidth': 3}, showcaps=False)
+            ax.set_xticks(range(1, len(num_10) + 1))
+            ax.set_xticklabels(num_10)
             fig.suptitle('Violin Plot of all Continuous Variables', fontsize=15)
             fig.tight_layout()
             if verbose <= 1:
@@ -1015,6 +1533,7 @@ def draw_violinplot(df, dep, nums, verbose, chart_format, modeltype='Regression'
         plot_name = "Box_Plots"
         ###### This is for Classification problems only ##########################
         image_count = 0
+        colors = cycle(sns.color_palette())
         ######################### Add Box plots here ##################################
         # Styling...
         if len(othernums) >= 1:
@@ -1027,13 +1546,16 @@ def draw_violinplot(df, dep, nums, verbose, chart_format, modeltype='Regression'
             fig = plt.figure(figsize=(width_size, rows * height_size))
             for col in nums:
                 ax = plt.subplot(rows, cols, count + 1)
-                sns.boxplot(x=dep,
-                            y=col,
-                            data=df,
-                            ax=ax,
-                            linewidth=3, notch=False, saturation=0.5, showfliers=False)
+                #### one box per class, from the statistics of that class only
+                boxes = [box_statistics(values, label=str(target_var)) for target_var, values in
+                         split_by_class(df[col], df[dep]).items()]
+                boxes = [box for box in boxes if box is not None]
+                if boxes:
+                    ax.bxp(boxes, showfliers=False, patch_artist=True,
+                           boxprops={'facecolor': next(colors), 'alpha': 0.5, 'linewidth': 3},
+                           whiskerprops={'linewidth': 3}, capprops={'linewidth': 3}, medianprops={'linewidth': 3})
+                    ax.set_xticklabels([box['label'] for box in boxes], rotation=30, ha='right', fontsize=9)
                 ax.set_title('%s for each %s' % (col, dep))
-                ax.set_xticklabels(df[dep].value_counts().index, rotation=30, ha='right', fontsize=9)
                 count += 1
             fig.suptitle('Box Plots without Outliers shown', fontsize=15)
             fig.tight_layout()
@@ -1048,10 +1570,137 @@ def draw_violinplot(df, dep, nums, verbose, chart_format, modeltype='Regression'
     ########## End of Violin Plots #########
 
 
+#### Long time series are cut down to about two points per pixel before they are drawn. Each series is
+#### split into buckets and only the lowest and highest point of each bucket (or the point that spans the
+#### largest triangle, for LTTB) is kept, so the peaks still show up in the chart.
+max_series_points = 2000
+
+
+def decimation_positions(x, y, max_points=max_series_points, method='minmax'):
+    """
+    Returns the sorted positions of the points of y (at x) to keep so that at most max_points are drawn.
+    method='minmax' keeps the min and max of each bucket and 'lttb' uses Largest-Triangle-Three-Buckets.
+    The first and last points are always kept.
+    """
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    if method == 'minmax':
+        n_buckets = max(1, (max_points - 2) // 2)
+        sizes = np.diff(np.linspace(0, n, n_buckets + 1).astype(np.int64))
+        bucket = np.repeat(np.arange(n_buckets), sizes)
+        order = np.lexsort((y, bucket))
+        ends = np.cumsum(sizes)
+        return np.unique(np.concatenate([[0, n - 1], order[ends - sizes], order[ends - 1]]))
+    elif method == 'lttb':
+        edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+        positions = np.zeros(max_points, dtype=np.int64)
+        positions[-1] = n - 1
+        a = 0
+        for i in range(max_points - 2):
+            lo, hi = edges[i], edges[i + 1]
+            if i + 2 < len(edges):
+                next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+            else:
+                next_x, next_y = x[n - 1], y[n - 1]
+            area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+            a = lo + int(np.argmax(area))
+            positions[i + 1] = a
+        return positions
+    else:
+        raise ValueError("method must be 'minmax' or 'lttb', not %s" % method)
+
+
+def decimate_frame(data, max_points=max_series_points, method='minmax'):
+    """
+    Returns the rows of a Series or DataFrame that are enough to draw each column as a line of about
+    max_points points. Dates or numbers in the index are used as x (sorted first if they are not in
+    order); any other index is drawn in row order. Frames keep the union of the rows chosen for each column.
+    """
+    if len(data) <= max_points:
+        return data
+    index = data.index
+    if isinstance(index, pd.DatetimeIndex) or pd.api.types.is_numeric_dtype(index):
+        if index.hasnans:
+            data = data[index.notna()]
+            if len(data) <= max_points:
+                return data
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index(kind='stable')
+        x = data.index - data.index[0]
+        if isinstance(index, pd.DatetimeIndex):
+            x = x / pd.Timedelta(seconds=1)
+        x = np.asarray(x, dtype=np.float64)
+    else:
+        x = np.arange(len(data), dtype=np.float64)
+    columns = data.to_frame() if isinstance(data, pd.Series) else data
+    keep = [np.array([0, len(data) - 1])]
+    for col in range(columns.shape[1]):
+        try:
+            y = columns.iloc[:, col].to_numpy(dtype=np.float64, na_value=np.nan)
+        except (TypeError, ValueError):
+            continue
+        present = np.flatnonzero(~np.isnan(y))
+        keep.append(present[decimation_positions(x[present], y[present], max_points, method)])
+    return data.iloc[np.unique(np.concatenate(keep))]
+
+
+#### Time series are averaged over calendar buckets (hours, days, weeks or months) picked from the span and
+#### spacing of the dates. One groupby gives the sums and counts for every class and bucket, and the
+#### averages over all classes come from those, so every time series chart reads from the same small table.
+RESAMPLE_FREQUENCIES = [(pd.offsets.Hour(), pd.Timedelta(hours=1)), (pd.offsets.Day(), pd.Timedelta(days=1)),
+                        (pd.offsets.Week(weekday=6), pd.Timedelta(weeks=1)),
+                        (pd.offsets.MonthBegin(), pd.Timedelta(days=31))]
+
+
+def pick_resample_frequency(dates, max_buckets=max_series_points):
+    """
+    Returns the finest of hourly, daily, weekly or monthly buckets that is no finer than the usual gap between
+    dates and splits their span into at most max_buckets buckets. Returns None if there are no more than
+    max_buckets distinct dates, since then each date can be its own bucket.
+    """
+    unique = pd.DatetimeIndex(dates).dropna().unique().sort_values()
+    if len(unique) <= max_buckets:
+        return None
+    span = unique[-1] - unique[0]
+    gap = pd.Series(unique).diff().median()
+    for offset, width in RESAMPLE_FREQUENCIES:
+        if width >= gap and span / width <= max_buckets:
+            return offset
+    return RESAMPLE_FREQUENCIES[-1][0]
+
+
+def aggregate_time_series(df, dates, num_vars, dep=None, max_buckets=max_series_points):
+    """
+    Averages the numeric vars in num_vars over time buckets of dates, which are in the same order as the rows of df.
+    Returns a dict with the bucket frequency, the 'overall' averages indexed by bucket and, if dep is given,
+    the 'by_class' averages indexed by (class, bucket). Both come from a single groupby of df.
+    """
+    nums = [x for x in find_remove_duplicates(num_vars) if x != dep and x in df.columns and
+            pd.api.types.is_numeric_dtype(df[x])]
+    dates = pd.DatetimeIndex(dates)
+    present = np.asarray(dates.notna())
+    data = df[nums][present]
+    data.index = dates[present]
+    frequency = pick_resample_frequency(data.index, max_buckets)
+    keys = [pd.Grouper(freq=frequency) if frequency is not None else data.index]
+    if dep is not None:
+        data[dep] = df[dep].to_numpy()[present]
+        keys = [dep] + keys
+    grouped = data.groupby(keys, dropna=False)
+    sums, counts = grouped.sum(), grouped.count()
+    aggregates = {'frequency': frequency, 'by_class': None}
+    if dep is not None:
+        aggregates['by_class'] = (sums / counts).dropna(how='all')
+        sums, counts = sums.groupby(level=1).sum(), counts.groupby(level=1).sum()
+    aggregates['overall'] = (sums / counts).dropna(how='all')
+    return aggregates
+
+
 #### Drawing Date Variables is very important in Time Series data
+@manage_figures
 def draw_date_vars(dfx, dep, datevars, num_vars, verbose, chart_format, modeltype='Regression', mk_dir=None):
-    dfx = copy.deepcopy(dfx)  ## use this to preserve the original dataframe
-    df = copy.deepcopy(dfx)  #### use this for making it into a datetime index etc...
+    df = dfx[:]  #### use this for making it into a datetime index etc... dfx is left as it is
     ##### Fixed problems with number of plots no_plots. It now works well for regressions!
     plot_name = 'Time_Series_Plots'
     #### Now you want to display 2 variables at a time to see how they change over time
@@ -1067,35 +1716,12 @@ def draw_date_vars(dfx, dep, datevars, num_vars, verbose, chart_format, modeltyp
         pass
 
     if isinstance(df.index, pd.DatetimeIndex):
-        pass
+        ts_column = df.index.name
     elif len(datevars) > 0:
         try:
             ts_column = datevars[0]
-            ### if we have already found that it was a date time var, then leave it as it is. That's good enough!
-            date_items = df[ts_column].apply(str).apply(len)
-            try:
-                date_4_digit = (date_items == 4).all() | (date_items == 6).all()
-            except:
-                date_4_digit = False
-            ### remove the next line it is not working well for non-4 digit dates
-            # date_4_digit = all(date_items[0] == item for item in date_items) ### this checks for 4 digits date
-            #### In some cases, date time variable is a year like 1999 (4-digit), this must be translated correctly
-            if date_4_digit:
-                if date_items[0] == 4:
-                    ### If it is just a year variable alone, you should leave it as just a year!
-                    df[ts_column] = df[ts_column].map(lambda x: pd.to_datetime(x, format='%Y', errors='coerce')).values
-                else:
-                    ### if it is not a year alone, then convert it into a date time variable
-                    if df[ts_column].min() > 1900 or df[ts_column].max() < 2100:
-                        df[ts_column] = df[ts_column].map(lambda x: '0101' + str(x) if len(str(x)) == 4 else x)
-                        df[ts_column] = pd.to_datetime(df[ts_column], format='%m%d%Y', errors='coerce')
-                    else:
-                        print(f'{ts_column} could not be indexed. Could not draw date_vars.')
-                        return imgdata_list
-            else:
-                df[ts_column] = pd.to_datetime(df[ts_column], infer_datetime_format=True, errors='coerce')
-            ##### Now set the column to be the date - time index
-            df.index = df.pop(ts_column)  #### This is where we set the date time column as the index ######
+            ##### Now set the column to be the date - time index. Years like 1999 are parsed as dates too.
+            df.index = parse_date_column(df.pop(ts_column))  #### This is where we set the date time column as the index ######
         except:
             print(f'{ts_column} could not be indexed. Could not draw date_vars.')
             return imgdata_list
@@ -1106,11 +1732,12 @@ def draw_date_vars(dfx, dep, datevars, num_vars, verbose, chart_format, modeltyp
     cols = 2
     if modeltype == 'Regression':
         gap = 0.5
-        no_plots = df.groupby(ts_column).mean().shape[1]
+        averages = decimate_frame(aggregate_time_series(df, df.index, df.columns.tolist())['overall'])
+        no_plots = averages.shape[1]
         rows = int((no_plots / cols) + 0.99)
         fig, ax = plt.subplots(figsize=(width_size, rows * height_size))
         fig.subplots_adjust(hspace=gap)  ### This controls the space between rows
-        df.groupby(ts_column).mean().plot(subplots=True, ax=ax, layout=(rows, cols))
+        averages.plot(subplots=True, ax=ax, layout=(rows, cols))
         fig.suptitle('Time Series Plot for each Continuous Variable by %s' % ts_column, fontsize=15, y=1.01)
     elif modeltype == 'Clustering':
         kind = 'line'  #### you can change this to plot any kind of time series plot you want
@@ -1125,8 +1752,8 @@ def draw_date_vars(dfx, dep, datevars, num_vars, verbose, chart_format, modeltyp
             for (var1, var2) in combos:
                 plt.subplot(rows, cols, counter)
                 ax1 = plt.gca()
-                df[var1].plot(kind=kind, secondary_y=True, label=var1, ax=ax1)
-                df[var2].plot(kind=kind, title=var2 + ' (left_axis) vs. ' + var1 + ' (right_axis)', ax=ax1)
+                decimate_frame(df[var1]).plot(kind=kind, secondary_y=True, label=var1, ax=ax1)
+                decimate_frame(df[var2]).plot(kind=kind, title=var2 + ' (left_axis) vs. ' + var1 + ' (right_axis)', ax=ax1)
                 plt.legend(loc='best')
                 counter += 1
                 fig.suptitle('Time Series Plot by %s: Pairwise Continuous Variables' % ts_column, fontsize=15, y=1.01)
@@ -1151,15 +1778,15 @@ def draw_date_vars(dfx, dep, datevars, num_vars, verbose, chart_format, modeltyp
         counter = 1
         copy_target_vars = copy.deepcopy(target_vars)
         try:
+            by_class = aggregate_time_series(df, df.index, df.columns.tolist(), dep)['by_class']
             for target_var in copy_target_vars:
-                df_target = df[df[dep] == target_var]
                 ax1 = plt.subplot(rows, cols, counter)
-                df_target.groupby(ts_column).mean().plot(subplots=False, ax=ax1)
+                decimate_frame(by_class.xs(target_var, level=0)).plot(subplots=False, ax=ax1)
                 ax1.set_title('Time Series plots for ' + dep + ' value = ' + target_var)
                 counter += 1
         except:
             plt.close('all')
-            fig = plot_fast_average_num_by_cat(df_target, datevars, num_vars, verbose, kind="line")
+            fig = plot_fast_average_num_by_cat(dfx, datevars, num_vars, verbose, kind="line")
         fig.suptitle('Time Series Plot by %s: Continuous Variables Pair' % ts_column, fontsize=15, y=1.01)
     if verbose == 2:
         imgdata_list.append(save_image_data(fig, chart_format,
@@ -1248,6 +1875,7 @@ def catscatter(data, colx, coly, ax, ratio=10):
 
 
 ############################################################################
+@manage_figures
 def draw_catscatterplots(dft, cats, verbose, chart_format, mk_dir=None):
     """
     The function draws catscatter plots for pairs of categorical variables in a data frame. 
@@ -1522,7 +2150,7 @@ def analyze_columns_in_dataset(dfx, IDcolse, verbose):
                     date_vars.append(col)
         for col in discrete_string_vars:
             try:
-                dfx.index = pd.to_datetime(dfx.pop(col), infer_datetime_format=True)
+                dfx.index = parse_date_column(dfx.pop(col))
             except:
                 continue
     if isinstance(dfx.index, pd.DatetimeIndex):
@@ -1546,36 +2174,210 @@ def find_remove_duplicates(values):
 
 
 #################################################################################
-def load_file_dataframe(dataname, sep=",", header=0, nrows=None, parse_dates=False):
+def read_csv_reservoir_sample(dataname, nrows, sep=",", header=0, encoding=None, parse_dates=False,
+                              chunksize=None, random_state=99):
+    """
+    Streams a CSV file in chunks and keeps a fixed-size uniform random sample of nrows rows.
+    Every row gets a random key and only the nrows rows with the smallest keys are kept in the
+    reservoir, so peak memory is bounded by nrows + chunksize rows instead of the file size.
+    Returns the sampled rows in file order (indexed by row position in file) and the total row count.
+    """
+    if chunksize is None:
+        chunksize = int(min(max(nrows, 10000), 100000))
+    rng = np.random.default_rng(random_state)
+    reservoir = None
+    keys = np.empty(0)
+    total_rows = 0
+    with pd.read_csv(dataname, sep=sep, header=header, encoding=encoding,
+                     parse_dates=parse_dates, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk_keys = rng.random(len(chunk))
+            total_rows += len(chunk)
+            if reservoir is None:
+                reservoir, keys = chunk, chunk_keys
+            else:
+                if len(reservoir) >= nrows:
+                    ### once the reservoir is full, only rows with a smaller key than its largest key can get in
+                    mask = chunk_keys < keys.max()
+                    chunk, chunk_keys = chunk[mask], chunk_keys[mask]
+                reservoir = pd.concat([reservoir, chunk])
+                keys = np.concatenate([keys, chunk_keys])
+            if len(reservoir) > nrows:
+                keep = np.sort(np.argpartition(keys, nrows - 1)[:nrows])
+                reservoir, keys = reservoir.iloc[keep], keys[keep]
+    if reservoir is None:
+        ### the file has a header but no rows in it
+        reservoir = pd.read_csv(dataname, sep=sep, header=header, encoding=encoding, nrows=0)
+    return reservoir, total_rows
+
+
+#################################################################################
+columnar_file_types = ('parquet', 'pq', 'feather', 'arrow', 'ipc')
+
+
+def ensure_pyarrow_imported():
+    global pa, pq
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet, Feather or Arrow files needs pyarrow. Please pip install autoviz[columnar]"
+                          " or pip install pyarrow: %s" % str(e))
+
+
+def is_columnar_file(dataname):
+    return isinstance(dataname, str) and dataname.lower().endswith(columnar_file_types)
+
+
+def read_columnar_schema(dataname):
+    """Returns the column names stored in a Parquet, Feather or Arrow IPC file without reading any rows."""
+    ensure_pyarrow_imported()
+    if dataname.lower().endswith(('parquet', 'pq')):
+        return pq.ParquetFile(dataname, memory_map=True).schema_arrow.names
+    with pa.memory_map(dataname) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def sample_row_groups(group_sizes, nrows, rng):
+    """
+    Picks row groups (or record batches) in random order until they hold at least nrows rows.
+    Returns the chosen group numbers in file order and the file row position each group starts at.
+    """
+    group_sizes = np.asarray(group_sizes, dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(group_sizes)[:-1]])
+    if nrows is None or group_sizes.sum() <= nrows:
+        return np.arange(len(group_sizes)), starts
+    order = rng.permutation(len(group_sizes))
+    enough = np.searchsorted(np.cumsum(group_sizes[order]), nrows) + 1
+    chosen = np.sort(order[:enough])
+    return chosen, starts[chosen]
+
+
+def read_columnar_sample(dataname, nrows=None, columns=None, random_state=99):
+    """
+    Reads a Parquet, Feather (v2) or Arrow IPC file. Only the given columns are read and, if nrows
+    is given, only randomly chosen row groups (Parquet) or record batches (Feather/Arrow) holding at
+    least nrows rows are read from a memory-mapped file. Those rows are then sampled down to nrows.
+    Returns the rows in file order (indexed by row position in file) and the total row count.
+    """
+    ensure_pyarrow_imported()
+    rng = np.random.default_rng(random_state)
+    if dataname.lower().endswith(('parquet', 'pq')):
+        pfile = pq.ParquetFile(dataname, memory_map=True)
+        group_sizes = [pfile.metadata.row_group(i).num_rows for i in range(pfile.num_row_groups)]
+        chosen, starts = sample_row_groups(group_sizes, nrows, rng)
+        table = pfile.read_row_groups(chosen.tolist(), columns=columns, use_pandas_metadata=True)
+        dfte = table.to_pandas()
+    else:
+        with pa.memory_map(dataname) as source:
+            try:
+                reader = pa.ipc.open_file(source)
+            except pa.ArrowInvalid:
+                reader = None
+            if reader is None:
+                ### Feather v1 files are not Arrow IPC files, so they can only be read as a whole
+                from pyarrow import feather
+                table = feather.read_table(dataname, columns=columns, memory_map=True)
+                group_sizes = [table.num_rows]
+                chosen, starts = sample_row_groups(group_sizes, None, rng)
+            else:
+                group_sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+                chosen, starts = sample_row_groups(group_sizes, nrows, rng)
+                batches = [reader.get_batch(i) for i in chosen]
+                if columns is not None:
+                    batches = [batch.select(columns) for batch in batches]
+                schema = reader.schema if columns is None else pa.schema([reader.schema.field(x) for x in columns])
+                table = pa.Table.from_batches(batches, schema=schema)
+            dfte = table.to_pandas()
+    total_rows = int(np.sum(group_sizes))
+    if isinstance(dfte.index, pd.RangeIndex):
+        dfte.index = np.concatenate([np.arange(start, start + group_sizes[group])
+                                     for group, start in zip(chosen, starts)]).astype(np.int64)
+    if nrows is not None and len(dfte) > nrows:
+        dfte = dfte.iloc[np.sort(rng.choice(len(dfte), size=nrows, replace=False))]
+    return dfte, total_rows
+
+
+def select_columnar_columns(dataname, depVar, max_rows_analyzed, max_cols_analyzed, verbose=0,
+                            probe_rows=10000, random_state=99):
+    """
+    Decides which columns of a Parquet, Feather or Arrow file are worth reading by classifying a
+    small probe sample of row groups. ID and low-information columns are left out and, if there
+    are too many predictors and a target, only the top features found by XGBoost are kept.
+    Returns the list of columns to read and whether the predictors were already ranked.
+    """
+    probe, _ = read_columnar_sample(dataname, nrows=min(probe_rows, max_rows_analyzed), random_state=random_state)
+    targets = [] if depVar is None or depVar == '' else (depVar if isinstance(depVar, list) else [depVar])
+    orig_preds = [x for x in list(probe) if x not in targets]
+    var_df = classify_columns(probe[orig_preds], verbose=0)
+    preds = [x for x in orig_preds if x not in var_df['id_vars'] + var_df['cols_delete']]
+    ranked = False
+    if len(targets) > 0 and len(preds) >= max_cols_analyzed:
+        problem_type = analyze_problem_type(probe, targets[0], verbose)
+        if len(var_df['continuous_vars']) == 0 and len(var_df['int_vars']) > 0:
+            numvars = var_df['int_vars']
+        else:
+            numvars = var_df['continuous_vars']
+        print('Number of variables = %d exceeds limit, finding top %d variables through XGBoost on %d rows' % (
+            len(preds), max_cols_analyzed, len(probe)))
+        important_features, _, _ = find_top_features_xgb(probe, preds, numvars, targets[0], problem_type,
+                                                          verbose=verbose)
+        important_features = [x for x in important_features if x in preds]
+        preds = important_features[:max_cols_analyzed]
+        ranked = True
+    if verbose >= 1:
+        print('    Reading %d of %d columns from %s' % (len(preds + targets), len(list(probe)), dataname))
+    return preds + targets, ranked
+
+
+def load_file_dataframe(dataname, sep=",", header=0, nrows=None, parse_dates=False,
+                        chunksize=None, random_state=99, columns=None):
     ###########################  This is where we load file or data frame ###############
+    #### If nrows is given, CSV files are streamed in chunks of chunksize rows and a random sample of
+    #### nrows is kept. Use random_state to get the same sample every time you load the same file.
+    #### Parquet, Feather and Arrow files are sampled by row group and only the given columns are read.
     if isinstance(dataname, str):
         #### this means they have given file name as a string to load the file #####
         codex_flag = False
         codex = ['ascii', 'utf-8', 'iso-8859-1', 'cp1252', 'latin1']
 
+        def read_csv_file(encoding):
+            if nrows is None:
+                dfte = pd.read_csv(dataname, sep=sep, header=header, encoding=encoding,
+                                   parse_dates=parse_dates)
+            else:
+                dfte, total_rows = read_csv_reservoir_sample(dataname, nrows, sep=sep, header=header,
+                                                             encoding=encoding, parse_dates=parse_dates,
+                                                             chunksize=chunksize, random_state=random_state)
+                if nrows < total_rows:
+                    print('    max_rows_analyzed is smaller than dataset shape %d...' % total_rows)
+                    print('        randomly sampled %d rows from read CSV file' % nrows)
+            print('Shape of your Data Set loaded: %s' % (dfte.shape,))
+            if len(np.array(list(dfte))[dfte.columns.duplicated()]) > 0:
+                print('You have duplicate column names in your data set. Removing duplicate columns now...')
+                dfte = dfte[list(dfte.columns[~dfte.columns.duplicated(keep='first')])]
+            return dfte
+
         if dataname != '' and dataname.endswith('csv'):
             try:
-                dfte = pd.read_csv(dataname, sep=sep, header=header, encoding=None,
-                                   parse_dates=parse_dates)
-                if nrows is not None:
-                    if nrows < dfte.shape[0]:
-                        print('    max_rows_analyzed is smaller than dataset shape %d...' % dfte.shape[0])
-                        dfte = dfte.sample(nrows, replace=False, random_state=99)
-                        print('        randomly sampled %d rows from read CSV file' % nrows)
-                print('Shape of your Data Set loaded: %s' % (dfte.shape,))
-                if len(np.array(list(dfte))[dfte.columns.duplicated()]) > 0:
-                    print('You have duplicate column names in your data set. Removing duplicate columns now...')
-                    dfte = dfte[list(dfte.columns[~dfte.columns.duplicated(keep='first')])]
-                return dfte
+                return read_csv_file(None)
             except:
                 codex_flag = True
         if codex_flag:
             for code in codex:
                 try:
-                    pass
+                    return read_csv_file(code)
                 except:
                     print('    pandas %s encoder does not work for this file. Continuing...' % code)
                     continue
+        elif is_columnar_file(dataname):
+            dfte, total_rows = read_columnar_sample(dataname, nrows=nrows, columns=columns,
+                                                    random_state=random_state)
+            if nrows is not None and nrows < total_rows:
+                print('    max_rows_analyzed is smaller than dataset shape %d...' % total_rows)
+                print('        randomly sampled %d rows from row groups of %s' % (len(dfte), dataname))
+            print('Shape of your Data Set loaded: %s' % (dfte.shape,))
+            return dfte
         elif dataname.endswith(('xlsx', 'xls', 'txt')):
             #### It's very important to get header rows in Excel since people put headers anywhere in Excel#
             if nrows is None:
@@ -1590,14 +2392,14 @@ def load_file_dataframe(dataname, sep=",", header=0, nrows=None, parse_dates=Fal
     elif isinstance(dataname, pd.DataFrame):
         #### this means they have given a dataframe name to use directly in processing #####
         if nrows is None:
-            dfte = copy.deepcopy(dataname)
+            dfte = share_or_copy(dataname)
         else:
             if nrows < dataname.shape[0]:
                 print(
                     '    Since nrows is smaller than dataset, loading random sample of %d rows into pandas...' % nrows)
-                dfte = dataname.sample(n=nrows, replace=False, random_state=99)
+                dfte = dataname.sample(n=nrows, replace=False, random_state=random_state)
             else:
-                dfte = copy.deepcopy(dataname)
+                dfte = share_or_copy(dataname)
         print('Shape of your Data Set loaded: %s' % (dfte.shape,))
         if len(np.array(list(dfte))[dfte.columns.duplicated()]) > 0:
             print('You have duplicate column names in your data set. Removing duplicate columns now...')
@@ -1610,25 +2412,39 @@ def load_file_dataframe(dataname, sep=",", header=0, nrows=None, parse_dates=Fal
 
 ##########################################################################################
 def classify_print_vars(filename: str or pd.DataFrame, sep, max_rows_analyzed, max_cols_analyzed,
-                        depVar='', header=0, verbose=0):
+                        depVar='', header=0, verbose=0, chunksize=None, random_state=99):
     corr_limit = 0.7  ### This limit represents correlation above this, vars will be removed
 
     if isinstance(filename, str):
-        dataname = copy.deepcopy(filename)
+        dataname = filename
         parse_dates = True
     elif isinstance(filename, pd.DataFrame):
-        dataname = copy.deepcopy(filename)
+        dataname = filename
         parse_dates = False
 
-    dfte = load_file_dataframe(dataname, sep=sep, header=header, nrows=max_rows_analyzed, parse_dates=parse_dates)
+    features_ranked = False
+    if is_columnar_file(dataname):
+        #### columnar files are read column by column: find which columns are worth reading first ###
+        with stage_timer('select_columnar_columns'):
+            columns, features_ranked = select_columnar_columns(dataname, depVar, max_rows_analyzed,
+                                                               max_cols_analyzed, verbose=verbose,
+                                                               random_state=random_state)
+    else:
+        columns = None
+    with stage_timer('load_file_dataframe') as stage:
+        dfte = load_file_dataframe(dataname, sep=sep, header=header, nrows=max_rows_analyzed,
+                                   parse_dates=parse_dates, chunksize=chunksize, random_state=random_state,
+                                   columns=columns)
+        stage['rows'], stage['columns'] = dfte.shape
 
     orig_preds = [x for x in list(dfte) if x not in [depVar]]
     #################    CLASSIFY  COLUMNS   HERE    ######################
     if len(dfte) >= 100000:
         dfte_small = dfte.sample(n=10000, random_state=99)
     else:
-        dfte_small = copy.deepcopy(dfte)
-    var_df = classify_columns(dfte_small[orig_preds], verbose)
+        dfte_small = dfte
+    with stage_timer('classify_columns', len(dfte_small), len(orig_preds)):
+        var_df = classify_columns(dfte_small[orig_preds], verbose)
     #####       Classify Columns   ################
     id_cols = var_df['id_vars']
     discrete_string_vars = var_df['nlp_vars'] + var_df['discrete_string_vars']
@@ -1661,7 +2477,7 @@ def classify_print_vars(filename: str or pd.DataFrame, sep, max_rows_analyzed, m
             len(dfte), max_rows_analyzed))
         dft = dfte.sample(max_rows_analyzed, random_state=0)
     else:
-        dft = copy.deepcopy(dfte)
+        dft = share_or_copy(dfte)
     ###### This is where you find what type the dependent variable is ########
     if isinstance(depVar, list):
         # If depVar is a list, just select the first one in the list to visualize!
@@ -1707,20 +2523,22 @@ def classify_print_vars(filename: str or pd.DataFrame, sep, max_rows_analyzed, m
         print('Cannot find target variable to visualize. Returning...')
         return dft
     #############  Check if there are too many columns to visualize  ################
-    if len(preds) >= max_cols_analyzed:
+    if len(preds) >= max_cols_analyzed and not features_ranked:
         #########     In that case, SELECT IMPORTANT FEATURES HERE   ######################
         if problem_type.endswith('Classification') or problem_type == 'Regression':
             print('Number of variables = %d exceeds limit, finding top %d variables through XGBoost' % (len(
                 preds), max_cols_analyzed))
-            important_features, num_vars, _ = find_top_features_xgb(dft, preds, continuous_vars,
-                                                                    depVar, problem_type, corr_limit, verbose)
+            with stage_timer('find_top_features_xgb', len(dft), len(preds)):
+                important_features, num_vars, _ = find_top_features_xgb(dft, preds, continuous_vars,
+                                                                        depVar, problem_type, corr_limit, verbose)
             if len(important_features) >= max_cols_analyzed:
                 print(
                     '    Since number of features selected is greater than max columns analyzed, limiting to %d variables' % max_cols_analyzed)
                 important_features = important_features[:max_cols_analyzed]
             dft = dft[important_features + [depVar]]
             #### Time to  classify the important columns again. Set verbose to zero so you don't print it again ###
-            var_df = classify_columns(dft[important_features], verbose=0)
+            with stage_timer('classify_columns', len(dft), len(important_features)):
+                var_df = classify_columns(dft[important_features], verbose=0)
             id_cols = var_df['id_vars']
             discrete_string_vars = var_df['nlp_vars'] + var_df['discrete_string_vars']
             cols_delete = var_df['cols_delete']
@@ -1840,8 +2658,6 @@ def EDA_find_remove_columns_with_infinity(df, remove=False):
 
 
 #######################################################################################
-from sklearn.feature_selection import mutual_info_regression, mutual_info_classif
-from sklearn.feature_selection import SelectKBest
 ################################################################################
 from collections import defaultdict
 
@@ -1872,28 +2688,14 @@ def remove_variables_using_fast_correlation(df, numvars, modeltype, target,
     Finally, we are left with uncorrelated variables that are also highly important (mutual score).
     ##############  YOU MUST INCLUDE THE ABOVE MESSAGE IF YOU COPY THIS CODE IN YOUR LIBRARY #####
     """
+    from sklearn.feature_selection import mutual_info_regression, mutual_info_classif
+    from sklearn.feature_selection import SelectKBest
     print('    Removing correlated variables from %d numerics using SULO method' % len(numvars))
-    correlation_dataframe = df[numvars].corr()
-    a = correlation_dataframe.values
-    col_index = correlation_dataframe.columns.tolist()
-    index_triupper = list(zip(np.triu_indices_from(a, k=1)[0], np.triu_indices_from(a, k=1)[1]))
-    high_corr_index_list = [x for x in np.argwhere(abs(a[np.triu_indices(len(a), k=1)]) >= corr_limit)]
-    tuple_list = [y for y in [index_triupper[x[0]] for x in high_corr_index_list]]
-    correlated_pair = [(col_index[local_tuple[0]], col_index[local_tuple[1]]) for local_tuple in tuple_list]
-    corr_pair_dict = dict(return_dictionary_list(correlated_pair))
-    keys_in_dict = list(corr_pair_dict.keys())
-    reverse_correlated_pair = [(y, x) for (x, y) in correlated_pair]
-    reverse_corr_pair_dict = dict(return_dictionary_list(reverse_correlated_pair))
-    for key, val in reverse_corr_pair_dict.items():
-        if key in keys_in_dict:
-            if len(key) > 1:
-                corr_pair_dict[key] += val
-        else:
-            corr_pair_dict[key] = val
-    flat_corr_pair_list = [item for sublist in correlated_pair for item in sublist]
-    #### You can make it a dictionary or a tuple of lists. We have chosen the latter here to keep order intact.
-    corr_pair_count_dict = count_freq_in_list(flat_corr_pair_list)
-    corr_list = [k for (k, v) in corr_pair_count_dict]
+    #### adjacency[i, j] is True when variables i and j are highly correlated: degree counts their partners
+    adjacency = find_correlated_adjacency(df, numvars, corr_limit)
+    degree = np.count_nonzero(adjacency, axis=1)
+    corr_index = np.flatnonzero(degree)
+    corr_list = [numvars[i] for i in corr_index]
     ###### This is for ordering the variables from highest to lowest importance by target ###
     if len(corr_list) == 0:
         print('Selecting all (%d) variables since none of them are highly correlated...' % len(numvars))
@@ -1902,28 +2704,22 @@ def remove_variables_using_fast_correlation(df, numvars, modeltype, target,
         max_feats = len(corr_list)
         if modeltype == 'Regression':
             sel_function = mutual_info_regression
-            fs = SelectKBest(score_func=sel_function, k=max_feats)
-            fs.fit(df[corr_list], df[target])
-            mutual_info = dict(zip(corr_list, fs.scores_))
         else:
             sel_function = mutual_info_classif
-            fs = SelectKBest(score_func=sel_function, k=max_feats)
-            fs.fit(df[corr_list], df[target])
-            mutual_info = dict(zip(corr_list, fs.scores_))
+        fs = SelectKBest(score_func=sel_function, k=max_feats)
+        fs.fit(df[corr_list], df[target])
         #### The first variable in list has the highest correlation to the target variable ###
-        sorted_by_mutual_info = [key for (key, val) in sorted(mutual_info.items(), key=lambda kv: kv[1], reverse=True)]
+        sorted_by_mutual_info = corr_index[np.argsort(-fs.scores_, kind='stable')]
         #####   Now we select the final list of correlated variables ###########
         selected_corr_list = []
-        #### select each variable by the highest mutual info and see what vars are correlated to it
-        for each_corr_name in sorted_by_mutual_info:
-            ### add the selected var to the selected_corr_list
-            selected_corr_list.append(each_corr_name)
-            for each_remove in corr_pair_dict[each_corr_name]:
-                #### Now remove each variable that is highly correlated to the selected variable
-                if each_remove in sorted_by_mutual_info:
-                    sorted_by_mutual_info.remove(each_remove)
+        knocked_out = np.zeros(len(numvars), dtype=bool)
+        #### select each variable by the highest mutual info and knock out the variables correlated to it
+        for each_corr in sorted_by_mutual_info:
+            if not knocked_out[each_corr]:
+                selected_corr_list.append(numvars[each_corr])
+                knocked_out |= adjacency[each_corr]
         ##### Now we combine the uncorrelated list to the selected correlated list above
-        rem_col_list = left_subtract(list(correlation_dataframe), corr_list)
+        rem_col_list = [numvars[i] for i in np.flatnonzero(degree == 0)]
         final_list = rem_col_list + selected_corr_list
         if verbose >= 1:
             print('\nAfter removing highly correlated variables, following %d numeric vars selected: %s' % (
@@ -1931,17 +2727,38 @@ def remove_variables_using_fast_correlation(df, numvars, modeltype, target,
         return final_list
 
 
+def find_correlated_adjacency(df, numvars, corr_limit=0.70, block_size=1024):
+    """
+    Returns a boolean matrix that is True where two variables in numvars have an absolute Pearson
+    correlation of at least corr_limit (False on the diagonal). Unless the correlations of these
+    columns are cached, they are computed for block_size columns at a time by correlation_blocks,
+    so the full correlation matrix is not kept in memory when there are more than block_size columns.
+    """
+    numvars = list(numvars)
+    fingerprints = column_fingerprints(df[numvars])
+    matrix = find_cached_correlation(numvars, 'pearson', False, fingerprints)
+    if matrix is not None:
+        adjacency = np.abs(matrix.values) >= corr_limit
+    else:
+        adjacency = np.zeros((len(numvars), len(numvars)), dtype=bool)
+        for start, block in correlation_blocks(df, numvars, block_size=block_size):
+            adjacency[:, start:start + block.shape[1]] = np.abs(block) >= corr_limit
+            if block.shape[1] == len(numvars):
+                ### there is only one block: it is the whole correlation matrix, so keep it for the heatmaps
+                cache_correlation(pd.DataFrame(block, index=numvars, columns=numvars), 'pearson', False,
+                                  fingerprints)
+    np.fill_diagonal(adjacency, False)
+    return adjacency
+
+
 ###############################################################################################
 def count_freq_in_list(lst):
     """
     This counts the frequency of items in a list but MAINTAINS the order of appearance of items.
     This order is very important when you are doing certain functions. Hence, this function!
     """
-    temp = np.unique(lst)
-    result = []
-    for i in temp:
-        result.append((i, lst.count(i)))
-    return result
+    values, counts = np.unique(lst, return_counts=True)
+    return list(zip(values, counts.tolist()))
 
 
 def find_corr_vars(correlation_dataframe, corr_limit=0.70):
@@ -1982,8 +2799,8 @@ def convert_train_test_cat_col_to_numeric(start_train, start_test, col):
     #### This takes care of some categories that are present in train and not in test
     ###     and vice versa
     """
-    start_train = copy.deepcopy(start_train)
-    start_test = copy.deepcopy(start_test)
+    start_train = start_train[:]
+    start_test = start_test[:]
     if start_train[col].isnull().sum() > 0:
         ### Remember that fillna only works at dataframe level! ###
         start_train[[col]] = start_train[[col]].fillna("NA")
@@ -2033,20 +2850,30 @@ def convert_a_column_to_numeric(x, col_dict):
        This is an amazing function which performs exactly like a Label Encoding
        except that it is simpler and faster"""
     if isinstance(col_dict, str):
-        values = np.unique(x)
-        values2nums = dict(zip(values, range(len(values))))
+        codes, values = pd.factorize(x, sort=True)
         convert_dict = dict(zip(range(len(values)), values))
-        return x.replace(values2nums), convert_dict
+        return pd.Series(codes.astype(np.int32), index=x.index, name=x.name), convert_dict
     elif isinstance(col_dict, dict):
-        convert_dict = copy.deepcopy(col_dict)
-        keys = col_dict.keys()
-        newkeys = np.unique(x)
-        rem_keys = left_subtract(newkeys, keys)
-        max_val = max(col_dict.values()) + 1
-        for eachkey in rem_keys:
-            convert_dict.update({eachkey: max_val})
-            max_val += 1
-        return x.replace(convert_dict)
+        return category_codes(x, pd.Index(list(col_dict.keys())), np.asarray(list(col_dict.values())))
+
+
+def category_codes(x, categories, category_codes_list=None):
+    """
+    Returns x as int32 codes of its values in categories (an Index). The code of each category is its
+    position in categories, or its value in category_codes_list if that is given. Values that are not in
+    categories get new codes after the largest code, numbered in sorted order.
+    """
+    if category_codes_list is None:
+        category_codes_list = np.arange(len(categories))
+    positions = categories.get_indexer(x)
+    unseen = positions == -1
+    codes = np.full(len(x), -1, dtype=np.int64)
+    codes[~unseen] = np.asarray(category_codes_list, dtype=np.int64)[positions[~unseen]]
+    if unseen.any():
+        first_new_code = max(category_codes_list) + 1 if len(categories) > 0 else 0
+        new_codes, _ = pd.factorize(x[unseen], sort=True)
+        codes[unseen] = first_new_code + new_codes
+    return pd.Series(codes.astype(np.int32), index=x.index, name=x.name)
 
 
 #######################################################################################
@@ -2066,6 +2893,35 @@ def convert_a_mixed_object_column_to_numeric(x, col_dict=''):
 
 
 ######################################################################################
+def encode_object_columns(train, test='', categories=None):
+    """
+    Encodes the string, object and category columns of train (and test, if it is a data frame) as int32
+    codes. Each column is encoded in one pass with pd.factorize: its values are converted to strings
+    (missing values become 'nan') and numbered in sorted order. If categories is given (a dictionary of
+    an Index of values for each column, as returned before), train is encoded with it too. Test values
+    that are not in train get new codes after the train codes.
+    Returns train, test and the dictionary of categories of each encoded column.
+    """
+    object_cols = train.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+    if len(object_cols) == 0:
+        return train, test, {} if categories is None else categories
+    train = train[:]
+    categories = {} if categories is None else dict(categories)
+    if not isinstance(test, str):
+        test = test[:]
+    for col in object_cols:
+        values = train[col].astype(str)
+        if col in categories:
+            train[col] = category_codes(values, categories[col])
+        else:
+            codes, categories[col] = pd.factorize(values, sort=True)
+            categories[col] = pd.Index(categories[col])
+            train[col] = pd.Series(codes.astype(np.int32), index=train.index, name=col)
+        if not isinstance(test, str) and col in test.columns:
+            test[col] = category_codes(test[col].astype(str), categories[col])
+    return train, test, categories
+
+
 def convert_all_object_columns_to_numeric(train, test):
     """
     #######################################################################################
@@ -2073,39 +2929,26 @@ def convert_all_object_columns_to_numeric(train, test):
     The beauty of this utility is that it does not blow up when it finds strings in test not in train.
     #######################################################################################
     """
-    train = copy.deepcopy(train)
-    if train.dtypes.any() == object:
-        lis = []
-        for row, column in train.dtypes.iteritems():
-            if column == object:
-                lis.append(row)
-        # print('%d string variables identified' %len(lis))
-        for everycol in lis:
-            # print('    Converting %s to numeric' %everycol)
-            try:
-                train[everycol], train_dict = convert_a_mixed_object_column_to_numeric(train[everycol])
-                if not isinstance(test, str):
-                    test[everycol] = convert_a_mixed_object_column_to_numeric(test[everycol], train_dict)
-            except:
-                # print('Error converting %s column from string to numeric. Continuing...' %everycol)
-                continue
+    train, test, _ = encode_object_columns(train, test)
     return train, test
 
 
 ###################################################################################
 ################      Find top features using XGB     ###################
 ################################################################################
-from xgboost import XGBClassifier, XGBRegressor
-
-
-def find_top_features_xgb(train, preds, numvars, target, modeltype, corr_limit=0.7, verbose=0):
+def find_top_features_xgb(train, preds, numvars, target, modeltype, corr_limit=0.7, verbose=0, fast=None,
+                          max_rows=50000, n_jobs=-1):
     """
     This is a fast utility that uses XGB to find top features.
     It returns a list of important features.
     Since it is XGB, you don't have to restrict the input to just numeric vars.
     You can send in all kinds of vars and it will take care of transforming it. Sweet!
+    If fast is True, the features are ranked by rank_features_with_hist_trees on at most max_rows rows
+    with n_jobs threads. fast=None uses it when there are fast_ranking_min_preds or more predictors.
     """
-    train = copy.deepcopy(train)
+    from xgboost import XGBClassifier, XGBRegressor
+    from sklearn.model_selection import train_test_split
+    train = train[:]
     preds = copy.deepcopy(preds)
     numvars = copy.deepcopy(numvars)
     ######################   I M P O R T A N T ##############################################
@@ -2126,7 +2969,6 @@ def find_top_features_xgb(train, preds, numvars, target, modeltype, corr_limit=0
     ######################   I M P O R T A N T ##############################################
     subsample = 0.7
     col_sub_sample = 0.7
-    train = copy.deepcopy(train)
     test_size = 0.2
     seed = 1
     early_stopping = 5
@@ -2204,6 +3046,20 @@ def find_top_features_xgb(train, preds, numvars, target, modeltype, corr_limit=0
     else:
         iter_limit = int(train_p.shape[1] / 5 + 0.5)
     print('Current number of predictors = %d ' % (train_p.shape[1],))
+    if fast is None:
+        fast = train_p.shape[1] >= fast_ranking_min_preds
+    if fast:
+        print('    Finding Important Features using histogram Boosted Trees on up to %d rows...' % max_rows)
+        try:
+            important_features = rank_features_with_hist_trees(train_p, y, modeltype, top_num, iter_limit,
+                                                               max_rows=max_rows, n_jobs=n_jobs, seed=seed)
+        except Exception as e:
+            print('Finding top features using XGB is crashing (%s). Continuing with all predictors...' % e)
+            return copy.deepcopy(preds), [], []
+        print('Found %d important features' % len(important_features))
+        numvars = [x for x in numvars if x in important_features]
+        important_cats = [x for x in important_cats if x in important_features]
+        return important_features, numvars, important_cats
     print('    Finding Important Features using Boosted Trees algorithm...')
     try:
         for i in range(0, train_p.shape[1], iter_limit):
@@ -2262,4 +3118,77 @@ def find_top_features_xgb(train, preds, numvars, target, modeltype, corr_limit=0
     numvars = [x for x in numvars if x in important_features]
     important_cats = [x for x in important_cats if x in important_features]
     return important_features, numvars, important_cats
+
+
+#### find_top_features_xgb ranks features with rank_features_with_hist_trees from this many predictors
+fast_ranking_min_preds = 200
+
+
+def sample_rows_for_ranking(X, y, modeltype, max_rows, seed=1):
+    """
+    Returns at most max_rows rows of X and y. For classification the sample keeps the share of each
+    class (stratified), unless a class is too small for that.
+    """
+    if len(X) <= max_rows:
+        return X, y
+    from sklearn.model_selection import train_test_split
+    stratify = None if modeltype == 'Regression' or y.value_counts().min() < 2 else y
+    X, _, y, _ = train_test_split(X, y, train_size=max_rows, stratify=stratify, random_state=seed)
+    return X, y
+
+
+def rank_features_with_hist_trees(train_p, y, modeltype, top_num, iter_limit, max_rows=50000, n_jobs=-1,
+                                  seed=1, test_size=0.2, early_stopping=5):
+    """
+    Ranks the features of train_p like find_top_features_xgb: a model is fitted on the predictors from
+    every iter_limit-th one to the last, and the top_num features of each model by gain are returned in order.
+    The models use histogram trees (tree_method='hist') on at most max_rows rows (stratified for
+    classifiers). With xgboost 1.7 or later, the validation data reuses the quantiles of the training data
+    (QuantileDMatrix). The models are fitted at the same time by threads that share n_jobs CPUs.
+    """
+    import xgboost as xgb
+    from concurrent.futures import ThreadPoolExecutor
+    from sklearn.model_selection import train_test_split
+    X, y = sample_rows_for_ranking(train_p, y, modeltype, max_rows, seed)
+    params = {'tree_method': 'hist', 'subsample': 0.7, 'colsample_bytree': 0.7, 'reg_alpha': 0.5,
+              'reg_lambda': 0.5, 'seed': seed}
+    if modeltype == 'Regression':
+        params['objective'] = 'reg:squarederror'
+        labels = y.to_numpy(dtype=np.float32, na_value=np.nan)
+        train_part = int((1 - test_size) * len(X))
+        X_train, X_cv, y_train, y_cv = X[:train_part], X[train_part:], labels[:train_part], labels[train_part:]
+    else:
+        labels, classes = pd.factorize(y)
+        params.update(max_depth=8, eta=0.1, gamma=1, min_child_weight=1)
+        if len(classes) == 2:
+            params['objective'] = 'binary:logistic'
+        else:
+            params.update(objective='multi:softmax', num_class=len(classes))
+        stratify = labels if np.bincount(labels).min() >= 2 else None
+        X_train, X_cv, y_train, y_cv = train_test_split(X, labels, test_size=test_size, random_state=seed,
+                                                        stratify=stratify)
+    X_train = X_train.to_numpy(dtype=np.float32, na_value=np.nan)
+    X_cv = X_cv.to_numpy(dtype=np.float32, na_value=np.nan)
+    columns = list(train_p.columns)
+    starts = list(range(0, len(columns), iter_limit))
+    n_threads = process_count(n_jobs, os.cpu_count() or 1)
+    n_workers = min(len(starts), n_threads)
+    params['nthread'] = max(1, n_threads // n_workers)
+
+    def rank_slice(start):
+        if hasattr(xgb, 'QuantileDMatrix'):
+            dtrain = xgb.QuantileDMatrix(X_train[:, start:], y_train)
+            dcv = xgb.QuantileDMatrix(X_cv[:, start:], y_cv, ref=dtrain)
+        else:
+            dtrain = xgb.DMatrix(X_train[:, start:], y_train)
+            dcv = xgb.DMatrix(X_cv[:, start:], y_cv)
+        booster = xgb.train(params, dtrain, num_boost_round=100, evals=[(dcv, 'cv')],
+                            early_stopping_rounds=early_stopping, verbose_eval=False)
+        #### features are named f0, f1... by their position in this slice of the columns
+        gains = pd.Series(booster.get_score(importance_type='gain'), dtype=float)
+        return [columns[start + int(name[1:])] for name in gains.sort_values(ascending=False).index[:top_num]]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        ranked = list(executor.map(rank_slice, starts))
+    return list(OrderedDict.fromkeys(feature for features in ranked for feature in features))
 ######################################################################################
@@ -1,8 +1,38 @@
 name = "autoviz"
 from .__version__ import __version__, __holo_version__
-from .AutoViz_Class import AutoViz_Class
-from .AutoViz_Class import data_cleaning_suggestions
-from .AutoViz_Class import FixDQ
+############################################################################################
+#### AutoViz_Class pulls in matplotlib, seaborn, sklearn and pandas_dq, and AutoViz_DQ pulls in pandas_dq.
+#### Each module is imported the first time one of its names is used, so that "import autoviz" stays fast.
+import sys
+import types
+
+_lazy_modules = {'AutoViz_Class': '.AutoViz_Class', 'data_cleaning_suggestions': '.AutoViz_DQ',
+                 'FixDQ': '.AutoViz_DQ'}
+_lazy_names = list(_lazy_modules)
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, attr, value):
+        ### any import of the submodule sets autoviz.AutoViz_Class to the module: keep the class instead
+        if attr in _lazy_names and isinstance(value, types.ModuleType):
+            value = getattr(value, attr)
+        super().__setattr__(attr, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __getattr__(name):
+    if name not in _lazy_names:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    import importlib
+    module = importlib.import_module(_lazy_modules[name], __name__)
+    globals()[name] = getattr(module, name)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(list(globals()) + _lazy_names)
 ############################################################################################
 if __name__ == "__main__":
     module_type = 'Running'
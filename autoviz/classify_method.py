@@ -32,6 +32,93 @@ def left_subtract(l1, l2):
     return lst
 
 
+#################################################################################
+#### Dates are parsed here once per column: the format is guessed from a small probe of values, then
+#### the whole column is parsed with that fixed format and the result is kept for the rest of the run.
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y/%m/%d', '%m/%d/%Y',
+                '%d/%m/%Y', '%m/%d/%Y %H:%M', '%d-%m-%Y', '%d.%m.%Y', '%Y-%m', '%b %Y', '%d %b %Y']
+NUMERIC_DATE_FORMATS = {4: '%Y', 6: '%Y%m', 8: '%Y%m%d'}
+date_cache = []
+max_cached_dates = 32
+
+
+def reset_date_cache():
+    del date_cache[:]
+
+
+def date_strings(series):
+    """
+    Returns the values of series as strings. Whole numbers like the year 1999.0 lose their decimals.
+    Missing numbers become '<NA>', which no date format matches.
+    """
+    if pd.api.types.is_float_dtype(series):
+        values = series.dropna()
+        if not (values == values.round()).all():
+            raise ValueError('%s has fractions so it cannot be a date' % series.name)
+        series = series.astype('Int64')
+    return series.astype(str)
+
+
+def guess_date_format(series, probe_size=100):
+    """
+    Returns the date format that parses every value in a probe of the first probe_size values in series.
+    Returns None if only pandas' own date parser can read the probe and raises ValueError if nothing can.
+    """
+    probe = series.dropna().head(probe_size)
+    if probe.empty:
+        raise ValueError('%s has no values to parse as dates' % series.name)
+    probe = date_strings(probe)
+    if pd.api.types.is_numeric_dtype(series):
+        lengths = probe.str.len().unique()
+        if len(lengths) == 1 and lengths[0] in NUMERIC_DATE_FORMATS:
+            formats = [NUMERIC_DATE_FORMATS[lengths[0]]]
+        else:
+            formats = []
+    else:
+        formats = [guess_datetime_format(probe.iloc[0])] + DATE_FORMATS
+    for date_format in formats:
+        if date_format is None:
+            continue
+        try:
+            pd.to_datetime(probe, format=date_format)
+            return date_format
+        except (ValueError, TypeError):
+            continue
+    if not pd.api.types.is_numeric_dtype(series):
+        pd.to_datetime(probe)
+        return None
+    raise ValueError('%s could not be parsed as dates' % series.name)
+
+
+def parse_date_column(series):
+    """
+    Returns series parsed as a DatetimeIndex with the same name. The format is guessed once and the
+    whole column is parsed with it, so values that do not match become NaT. Parsed columns are cached
+    by a hash of their values, so parsing the same column again later in the run is free.
+    Raises ValueError if series does not hold dates.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.DatetimeIndex(series, name=series.name)
+    weights = np.arange(1, len(series) + 1, dtype=np.uint64)
+    fingerprint = int((pd.util.hash_pandas_object(series, index=False).values * weights).sum())
+    for entry in date_cache:
+        if entry['fingerprint'] == fingerprint and entry['dtype'] == series.dtype:
+            return entry['dates'].rename(series.name)
+    date_format = guess_date_format(series)
+    values = date_strings(series) if pd.api.types.is_numeric_dtype(series) else series
+    dates = pd.DatetimeIndex(pd.to_datetime(values, format=date_format, errors='coerce'), name=series.name)
+    if dates.isna().all() and series.notna().any():
+        raise ValueError('%s could not be parsed as dates' % series.name)
+    date_cache.append({'fingerprint': fingerprint, 'dtype': series.dtype, 'dates': dates})
+    del date_cache[:-max_cached_dates]
+    return dates
+
+
 #################################################################################
 import copy
 
@@ -64,6 +151,83 @@ def EDA_find_remove_columns_with_infinity(df, remove=False, verbose=0):
         return add_cols
 
 
+####################################################################################
+#### these are the types infer_dtype gives when a column holds values of different types
+mixed_inferred_types = ['mixed', 'mixed-integer', 'mixed-integer-float', 'unknown-array']
+
+
+def has_mixed_types(series, probe_size=1000):
+    """
+    Returns True if the non-null values of a column are not all of the same Python type.
+    Only object and category columns can hold mixed types, so other dtypes are skipped right away.
+    A small probe of values is checked first so that most mixed columns stop at the first
+    conflicting value. Otherwise pandas infer_dtype decides and the column is scanned only when
+    infer_dtype reports a mixed type, stopping again at the first conflicting value.
+    """
+    if str(series.dtype) == 'category':
+        values = series.cat.categories.values
+    elif series.dtype == object:
+        values = series.dropna().values
+    else:
+        return False
+    if len(values) == 0:
+        return False
+    first_type = type(values[0])
+    if any(type(value) is not first_type for value in values[:probe_size]):
+        return True
+    if pd.api.types.infer_dtype(values, skipna=True) not in mixed_inferred_types:
+        return False
+    return any(type(value) is not first_type for value in values[probe_size:])
+
+
+def find_mixed_type_columns(df, probe_size=1000):
+    """
+    Returns a list of columns in a dataframe whose values are of more than one Python type.
+    """
+    return [col for col in list(df) if has_mixed_types(df[col], probe_size)]
+
+
+####################################################################################
+def profile_columns(df, top_k=5):
+    """
+    Profiles every column of a dataframe once so that classification decisions do not have to
+    compute value_counts again and again for the same column. Returns a dataframe indexed by
+    column name with the dtype, null count and fraction, number of unique values (without NaN),
+    min and max of numeric and datetime columns, string length stats of object and string columns
+    (non-string values count as length 0) and the top_k most frequent values with their counts.
+    """
+    nrows = len(df)
+    null_count = df.isnull().sum().values
+    nunique, top_values, str_len_max, str_len_sum = [], [], [], []
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        counts = series.value_counts()
+        if str(series.dtype) == 'category':
+            ### unused categories show up in value_counts with a count of zero
+            counts = counts[counts > 0]
+        nunique.append(len(counts))
+        top_values.append(list(counts.head(top_k).items()))
+        if series.dtype == object or str(series.dtype) == 'string':
+            try:
+                lengths = series.str.len().fillna(0)
+            except AttributeError:
+                ### the .str accessor refuses object columns without any strings in them
+                lengths = pd.Series(0, index=series.index)
+            str_len_max.append(lengths.max() if nrows > 0 else 0)
+            str_len_sum.append(lengths.sum())
+        else:
+            str_len_max.append(np.nan)
+            str_len_sum.append(np.nan)
+    profile = pd.DataFrame({'dtype': df.dtypes.values, 'null_count': null_count,
+                            'null_frac': null_count / nrows if nrows > 0 else np.zeros(df.shape[1]),
+                            'nunique': nunique, 'str_len_max': str_len_max, 'str_len_sum': str_len_sum,
+                            'top_values': top_values}, index=df.columns)
+    minmax = df.select_dtypes(include=['number', 'datetime']).columns
+    profile['min'] = df[minmax].min()
+    profile['max'] = df[minmax].max()
+    return profile
+
+
 ####################################################################################
 def classify_columns(df_preds, verbose=0):
     """
@@ -76,7 +240,7 @@ def classify_columns(df_preds, verbose=0):
     ####### Returns a dictionary with 10 kinds of vars like the following: # continuous_vars,int_vars
     # cat_vars,factor_vars, bool_vars,discrete_string_vars,nlp_vars,date_vars,id_vars,cols_delete
     """
-    train = copy.deepcopy(df_preds)
+    train = df_preds
     #### If there are 30 chars are more in a discrete_string_var, it is then considered an NLP variable
     max_nlp_char_size = 30
     max_cols_to_print = 30
@@ -95,10 +259,15 @@ def classify_columns(df_preds, verbose=0):
     orig_cols_total = train.shape[1]
     # Types of columns
     cols_delete = []
-    cols_delete = [col for col in list(train) if (len(train[col].value_counts()) == 1)
-                   | (train[col].isnull().sum() / len(train) >= 0.90)]
+    #### profile each column once: all decisions below use these numbers instead of value_counts
+    profile = profile_columns(train)
+    nunique = profile['nunique']
+    #### string columns are filled with two blanks before they are measured: count blanks as a value
+    nunique_filled = nunique + (profile['null_count'] > 0)
+    cols_delete = [col for col in list(train) if (nunique[col] == 1)
+                   | (profile.loc[col, 'null_frac'] >= 0.90)]
     inf_cols = EDA_find_remove_columns_with_infinity(train, remove=False, verbose=verbose)
-    mixed_cols = [x for x in list(train) if len(train[x].dropna().apply(type).value_counts()) > 1]
+    mixed_cols = find_mixed_type_columns(train)
     if len(mixed_cols) > 0:
         print('    Removing %s column(s) due to mixed data type detected...' % mixed_cols)
     cols_delete += mixed_cols
@@ -109,15 +278,15 @@ def classify_columns(df_preds, verbose=0):
     sum_all_cols['cols_delete'] = cols_delete
 
     var_df['bool'] = var_df.apply(
-        lambda x: 1 if x['type_of_column'] in ['bool', 'object'] and len(train[x['index']].value_counts()) == 2 else 0,
+        lambda x: 1 if x['type_of_column'] in ['bool', 'object'] and nunique[x['index']] == 2 else 0,
         axis=1)
     string_bool_vars = list(var_df[(var_df['bool'] == 1)]['index'])
     sum_all_cols['string_bool_vars'] = string_bool_vars
     var_df['num_bool'] = var_df.apply(lambda x: 1 if x['type_of_column'] in [np.uint8,
                                                                              np.uint16, np.uint32, np.uint64,
                                                                              'int8', 'int16', 'int32', 'int64',
-                                                                             'float16', 'float32', 'float64'] and len(
-        train[x['index']].value_counts()) == 2 else 0, axis=1)
+                                                                             'float16', 'float32', 'float64'] and nunique[
+        x['index']] == 2 else 0, axis=1)
     num_bool_vars = list(var_df[(var_df['num_bool'] == 1)]['index'])
     sum_all_cols['num_bool_vars'] = num_bool_vars
     ######   This is where we take all Object vars and split them into diff kinds ###
@@ -132,22 +301,19 @@ def classify_columns(df_preds, verbose=0):
     copy_discrete_or_nlp_vars = copy.deepcopy(discrete_or_nlp_vars)
     if len(discrete_or_nlp_vars) > 0:
         for col in copy_discrete_or_nlp_vars:
-            #### first fill empty or missing vals since it will blowup ###
-            ### Remember that fillna only works at the dataframe level!
-            train[[col]] = train[[col]].fillna('  ')
-            if train[col].map(lambda x: len(x) if type(x) == str else 0).max(
-            ) >= 50 and len(train[col].value_counts()) >= int(0.9 * len(train)) and col not in string_bool_vars:
+            #### missing values are measured as if they were filled with two blanks ###
+            null_count = profile.loc[col, 'null_count']
+            max_len = max(profile.loc[col, 'str_len_max'], 2 if null_count > 0 else 0)
+            mean_len = (profile.loc[col, 'str_len_sum'] + 2 * null_count) / len(train)
+            nuniques = nunique_filled[col]
+            if max_len >= 50 and nuniques >= int(0.9 * len(train)) and col not in string_bool_vars:
                 var_df.loc[var_df['index'] == col, 'nlp_strings'] = 1
-            elif train[col].map(lambda x: len(x) if type(x) == str else 0).mean(
-            ) >= max_nlp_char_size and train[col].map(lambda x: len(x) if type(x) == str else 0).max(
-            ) < 50 and len(train[col].value_counts()
-                           ) <= int(0.9 * len(train)) and col not in string_bool_vars:
+            elif mean_len >= max_nlp_char_size and max_len < 50 and nuniques <= int(
+                    0.9 * len(train)) and col not in string_bool_vars:
                 var_df.loc[var_df['index'] == col, 'discrete_strings'] = 1
-            elif len(train[col].value_counts()) > cat_limit and len(
-                    train[col].value_counts()) <= int(0.9 * len(train)) and col not in string_bool_vars:
+            elif nuniques > cat_limit and nuniques <= int(0.9 * len(train)) and col not in string_bool_vars:
                 var_df.loc[var_df['index'] == col, 'discrete_strings'] = 1
-            elif len(train[col].value_counts()) > cat_limit and len(train[col].value_counts()
-                                                                    ) == len(train) and col not in string_bool_vars:
+            elif nuniques > cat_limit and nuniques == len(train) and col not in string_bool_vars:
                 var_df.loc[var_df['index'] == col, 'id_col'] = 1
             else:
                 var_df.loc[var_df['index'] == col, 'cat'] = 1
@@ -180,22 +346,22 @@ def classify_columns(df_preds, verbose=0):
     ### this is where we save them as date time variables ###
     if len(var_df.loc[date_or_id == 1]) != 0:
         for col in var_df.loc[date_or_id == 1]['index'].values.tolist():
-            if len(train[col].value_counts()) == len(train):
-                if train[col].min() < 1900 or train[col].max() > 2050:
+            if nunique[col] == len(train):
+                if profile.loc[col, 'min'] < 1900 or profile.loc[col, 'max'] > 2050:
                     var_df.loc[var_df['index'] == col, 'id_col'] = 1
                 else:
                     try:
-                        pd.to_datetime(train[col], infer_datetime_format=True)
+                        parse_date_column(train[col])
                         var_df.loc[var_df['index'] == col, 'date_time'] = 1
                     except:
                         var_df.loc[var_df['index'] == col, 'id_col'] = 1
             else:
-                if train[col].min() < 1900 or train[col].max() > 2050:
+                if profile.loc[col, 'min'] < 1900 or profile.loc[col, 'max'] > 2050:
                     if col not in num_bool_vars:
                         var_df.loc[var_df['index'] == col, 'int'] = 1
                 else:
                     try:
-                        pd.to_datetime(train[col], infer_datetime_format=True)
+                        parse_date_column(train[col])
                         var_df.loc[var_df['index'] == col, 'date_time'] = 1
                     except:
                         if col not in num_bool_vars:
@@ -210,7 +376,7 @@ def classify_columns(df_preds, verbose=0):
     for date_var in copy_date_vars:
         #### This test is to make sure date vars are actually date vars
         try:
-            pd.to_datetime(train[date_var], infer_datetime_format=True)
+            parse_date_column(train[date_var])
         except:
             ##### if not a date var, then just add it to delete it from processing
             cols_delete.append(date_var)
@@ -226,8 +392,7 @@ def classify_columns(df_preds, verbose=0):
     #######  We need to make sure there are no categorical vars in float #######
     if len(var_df.loc[float_or_cat == 1]) > 0:
         for col in var_df.loc[float_or_cat == 1]['index'].values.tolist():
-            if 2 < len(train[col].value_counts()) <= float_limit and len(
-                    train[col].value_counts()) <= len(train):
+            if 2 < nunique[col] <= float_limit and nunique[col] <= len(train):
                 var_df.loc[var_df['index'] == col, 'cat'] = 1
             else:
                 if col not in (num_bool_vars + factor_vars):
@@ -243,7 +408,7 @@ def classify_columns(df_preds, verbose=0):
             factor_vars.remove(cat)
             var_df.loc[var_df['index'] == cat, 'dcat'] = 0
             var_df.loc[var_df['index'] == cat, 'numeric'] = 1
-        elif len(df_preds[cat].value_counts()) == df_preds.shape[0]:
+        elif nunique[cat] == df_preds.shape[0]:
             id_vars.append(cat)
             factor_vars.remove(cat)
             var_df.loc[var_df['index'] == cat, 'dcat'] = 0
@@ -258,7 +423,7 @@ def classify_columns(df_preds, verbose=0):
             cat_vars.remove(cat)
             var_df.loc[var_df['index'] == cat, 'cat'] = 0
             var_df.loc[var_df['index'] == cat, 'numeric'] = 1
-        elif len(df_preds[cat].value_counts()) == df_preds.shape[0]:
+        elif nunique[cat] == df_preds.shape[0]:
             id_vars.append(cat)
             cat_vars.remove(cat)
             var_df.loc[var_df['index'] == cat, 'cat'] = 0
@@ -278,10 +443,10 @@ def classify_columns(df_preds, verbose=0):
     ##### If there are more than 1000 unique values, then add it to NLP vars ###
     copy_discrete_vals = copy.deepcopy(discrete_string_vars)
     for each_discrete in copy_discrete_vals:
-        if train[each_discrete].nunique() >= 1000:
+        if nunique_filled[each_discrete] >= 1000:
             nlp_vars.append(each_discrete)
             discrete_string_vars.remove(each_discrete)
-        elif 100 < train[each_discrete].nunique() < 1000:
+        elif 100 < nunique_filled[each_discrete] < 1000:
             pass
         else:
             ### If it is less than 100 unique values, then make it categorical var
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoviz.classify_method import date_cache, find_mixed_type_columns, guess_date_format
+from autoviz.classify_method import parse_date_column, profile_columns, reset_date_cache
+
+
+class ProfileColumnsTest(unittest.TestCase):
+    def test_profile(self):
+        df = pd.DataFrame({'i': [3, 1, 2, 1], 'f': [1.5, np.nan, 1.5, 2.0],
+                           's': ['ab', None, 'abcd', 'ab'],
+                           'c': pd.Categorical(['u', 'u', 'u', 'u'], categories=['u', 'v'])})
+        profile = profile_columns(df, top_k=1)
+        self.assertEqual(profile['nunique'].tolist(), [3, 2, 2, 1])
+        self.assertEqual(profile['null_count'].tolist(), [0, 1, 1, 0])
+        self.assertEqual(profile.loc['f', 'null_frac'], 0.25)
+        self.assertEqual((profile.loc['i', 'min'], profile.loc['i', 'max']), (1, 3))
+        self.assertEqual(profile.loc['s', 'str_len_max'], 4)
+        self.assertEqual(profile.loc['s', 'str_len_sum'], 8)
+        self.assertTrue(np.isnan(profile.loc['i', 'str_len_max']))
+        self.assertEqual(profile.loc['s', 'top_values'], [('ab', 2)])
+
+
+class MixedTypeTest(unittest.TestCase):
+    def test_find_mixed_type_columns(self):
+        df = pd.DataFrame({'f': np.arange(20, dtype=float), 's': ['a'] * 20, 'm': ['a', 1] * 10,
+                           'late': ['a'] * 19 + [1], 'n': ['a', None] * 10,
+                           'c': pd.Categorical(['a', 1] * 10)})
+        self.assertEqual(find_mixed_type_columns(df, probe_size=5), ['m', 'late', 'c'])
+
+
+class ParseDateColumnTest(unittest.TestCase):
+    def setUp(self):
+        reset_date_cache()
+
+    def test_formats_are_guessed_from_a_probe(self):
+        self.assertEqual(guess_date_format(pd.Series(['2021-03-04', '2021-03-05'])), '%Y-%m-%d')
+        self.assertEqual(guess_date_format(pd.Series(['25/12/2020', '26/12/2020'])), '%d/%m/%Y')
+        self.assertEqual(guess_date_format(pd.Series([1999, 2001])), '%Y')
+        self.assertEqual(guess_date_format(pd.Series([199901.0, np.nan])), '%Y%m')
+        self.assertRaises(ValueError, guess_date_format, pd.Series(['apple', 'pear']))
+        self.assertRaises(ValueError, guess_date_format, pd.Series([3, 41, 5]))
+
+    def test_parsed_once_and_cached(self):
+        dates = pd.Series(['2021-03-04', '2021-03-05', None], name='day')
+        parsed = parse_date_column(dates)
+        self.assertIsInstance(parsed, pd.DatetimeIndex)
+        self.assertEqual(parsed.name, 'day')
+        self.assertEqual(parsed[1], pd.Timestamp('2021-03-05'))
+        self.assertTrue(parsed[2:].isna().all())
+        self.assertEqual(parse_date_column(dates.rename('other')).name, 'other')
+        self.assertEqual(len(date_cache), 1)
+        years = parse_date_column(pd.Series([1999, 2000]))
+        self.assertEqual(years.year.tolist(), [1999, 2000])
+        self.assertEqual(len(date_cache), 2)
@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoviz.AutoViz_Utils import correlation_blocks, correlation_cache, correlation_matrix, reset_correlation_cache
+from autoviz.AutoViz_Utils import find_correlated_adjacency, remove_variables_using_fast_correlation
+
+
+class CorrelationTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        base = rng.normal(size=500)
+        self.df = pd.DataFrame({'a': base, 'b': base + rng.normal(scale=0.1, size=500),
+                                'c': rng.normal(size=500), 'd': -base, 'e': np.ones(500)})
+        self.df['y'] = base + rng.normal(scale=0.5, size=500)
+        self.df.loc[3, 'c'] = np.nan
+        self.df.loc[10:20, 'b'] = np.nan
+        reset_correlation_cache()
+
+    def test_adjacency_matches_pandas_corr(self):
+        numvars = ['a', 'b', 'c', 'd', 'e']
+        adjacency = find_correlated_adjacency(self.df, numvars, 0.7, block_size=2)
+        expected = (self.df[numvars].corr().abs() >= 0.7).values
+        np.fill_diagonal(expected, False)
+        np.testing.assert_array_equal(adjacency, expected)
+
+    def test_one_variable_of_each_correlated_group_is_kept(self):
+        final_list = remove_variables_using_fast_correlation(self.df.fillna(0), ['a', 'b', 'c', 'd', 'e'],
+                                                             'Regression', 'y')
+        self.assertEqual(sorted(final_list[:2]), ['c', 'e'])
+        self.assertEqual(len(final_list), 3)
+        self.assertIn(final_list[2], ['a', 'b', 'd'])
+
+    def test_correlation_matrix_matches_pandas_corr(self):
+        for diff in [False, True]:
+            expected = (self.df.diff() if diff else self.df).corr()
+            np.testing.assert_allclose(correlation_matrix(self.df, diff=diff).values, expected.values, atol=1e-4)
+
+    def test_blocks_of_rows_and_columns_give_the_same_matrix(self):
+        columns = ['a', 'b', 'c', 'y']
+        matrix = np.hstack([block for _, block in correlation_blocks(self.df, columns, block_size=3, chunksize=64)])
+        np.testing.assert_allclose(matrix, self.df[columns].corr().values, atol=1e-4)
+
+    def test_differences_and_ranks_of_chunks_match_pandas(self):
+        columns = ['a', 'b', 'c', 'y']
+        for method, diff in [('pearson', True), ('spearman', False), ('spearman', True)]:
+            data = self.df[columns].diff() if diff else self.df[columns]
+            if method == 'spearman':
+                data = data.rank()
+            blocks = correlation_blocks(self.df, columns, method, diff, block_size=3, chunksize=64)
+            np.testing.assert_allclose(np.hstack([block for _, block in blocks]), data.corr().values, atol=1e-4)
+
+    def test_cached_matrix_is_reused_for_fewer_columns(self):
+        correlation_matrix(self.df)
+        self.assertEqual(len(correlation_cache), 1)
+        subset = correlation_matrix(self.df, ['y', 'a'])
+        self.assertEqual(len(correlation_cache), 1)
+        self.assertEqual(list(subset.columns), ['y', 'a'])
+        changed = self.df.copy()
+        changed['a'] = changed['a'] * 2 + 1
+        correlation_matrix(changed, ['y', 'a'])
+        self.assertEqual(len(correlation_cache), 2)
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from matplotlib import cbook
+
+from autoviz.AutoViz_Utils import binned_kde, box_statistics, sample_values, split_by_class, violin_statistics
+
+
+class BinnedKdeTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = np.concatenate([rng.normal(size=20000), rng.normal(5, 0.5, size=5000), [np.nan, np.inf]])
+
+    def test_matches_exact_kde(self):
+        grid, density = binned_kde(self.values)
+        values = self.values[np.isfinite(self.values)]
+        bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5.)
+        exact = np.exp(-0.5 * ((grid[:, None] - values[None, :]) / bandwidth) ** 2).sum(axis=1)
+        exact /= len(values) * bandwidth * np.sqrt(2 * np.pi)
+        np.testing.assert_allclose(density, exact, atol=5e-3)
+        self.assertAlmostEqual(density.sum() * (grid[1] - grid[0]), 1, places=3)
+
+    def test_no_spread(self):
+        self.assertIsNone(binned_kde([1.0, 1.0, 1.0]))
+        self.assertIsNone(violin_statistics([2.0]))
+
+
+class BoxStatisticsTest(unittest.TestCase):
+    def test_matches_matplotlib(self):
+        values = np.random.default_rng(1).standard_t(2, size=10000)
+        stats = box_statistics(values, label='t')
+        expected = cbook.boxplot_stats(values)[0]
+        for key in ['med', 'q1', 'q3', 'whislo', 'whishi', 'mean']:
+            self.assertAlmostEqual(stats[key], expected[key])
+        self.assertEqual(stats['label'], 't')
+        self.assertLessEqual(len(stats['fliers']), 200)
+        self.assertEqual(stats['fliers'].min(), expected['fliers'].min())
+        self.assertEqual(stats['fliers'].max(), expected['fliers'].max())
+        self.assertIsNone(box_statistics([np.nan]))
+
+
+class SplitByClassTest(unittest.TestCase):
+    def test_split_and_sample(self):
+        target = pd.Series(['b', 'a', None, 'b', 'a', 'b'])
+        values = pd.Series([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        split = split_by_class(values, target)
+        self.assertEqual(list(split), ['a', 'b'])
+        self.assertEqual(split['a'].tolist(), [2.0, 5.0])
+        self.assertEqual(split['b'].tolist(), [1.0, 4.0, 6.0])
+        self.assertEqual(len(sample_values(np.arange(10000.0), 100)), 100)
+        self.assertEqual(len(sample_values(np.arange(10.0), 100)), 10)
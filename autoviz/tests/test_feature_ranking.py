@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoviz.AutoViz_Utils import encode_object_columns, find_top_features_xgb, sample_rows_for_ranking
+
+
+class FeatureRankingTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame(rng.normal(size=(3000, 40)), columns=['num_%d' % i for i in range(40)])
+        self.df['y'] = np.where(self.df['num_0'] + self.df['num_1'] > 0, 'yes', 'no')
+        self.preds = ['num_%d' % i for i in range(40)]
+
+    def test_fast_ranking_finds_the_informative_features(self):
+        important_features, numvars, _ = find_top_features_xgb(self.df, self.preds, self.preds, 'y',
+                                                               'Binary_Classification', fast=True, max_rows=2000)
+        self.assertIn('num_0', important_features[:10])
+        self.assertIn('num_1', important_features[:10])
+        self.assertEqual(numvars, [x for x in self.preds if x in important_features])
+
+    def test_sample_keeps_share_of_each_class(self):
+        y = pd.Series(['a'] * 900 + ['b'] * 100)
+        X = pd.DataFrame({'x': range(1000)})
+        X_sample, y_sample = sample_rows_for_ranking(X, y, 'Binary_Classification', 200)
+        self.assertEqual(len(X_sample), 200)
+        self.assertEqual((y_sample == 'b').sum(), 20)
+
+
+class EncodeObjectColumnsTest(unittest.TestCase):
+    def test_train_codes_are_kept_for_test(self):
+        train = pd.DataFrame({'city': ['b', 'a', np.nan, 'b'], 'size': pd.Categorical(['s', 'l', 's', 's']),
+                              'value': [1.0, 2.0, 3.0, 4.0]})
+        test = pd.DataFrame({'city': ['a', 'z', 'c', 'b'], 'size': ['l', 'l', 'm', 's'], 'value': [1.0] * 4})
+        train_codes, test_codes, categories = encode_object_columns(train, test)
+        self.assertEqual(train_codes['city'].tolist(), [1, 0, 2, 1])
+        self.assertEqual(train_codes['city'].dtype, np.int32)
+        self.assertEqual(test_codes['city'].tolist(), [0, 4, 3, 1])
+        self.assertEqual(test_codes['size'].tolist(), [0, 0, 2, 1])
+        self.assertEqual(list(categories['city']), ['a', 'b', 'nan'])
+        self.assertEqual(train_codes['value'].tolist(), train['value'].tolist())
+        self.assertEqual(train['city'].tolist()[:2], ['b', 'a'])
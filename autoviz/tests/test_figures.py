@@ -0,0 +1,154 @@
+import base64
+import os
+import tempfile
+import unittest
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from autoviz.AutoViz_Utils import aggregate_time_series, average_nums_by_cat, pick_resample_frequency
+from autoviz.AutoViz_Utils import decimate_frame, decimation_positions, plot_fast_average_num_by_cat
+from autoviz.AutoViz_Utils import draw_pair_scatters
+from autoviz.AutoViz_Utils import figure_stats, manage_figures, reset_figure_stats, save_image_data
+
+
+@manage_figures
+def draw_two_figures(verbose=2, fail=False):
+    plt.figure()
+    plt.figure()
+    if fail:
+        raise ValueError('could not draw')
+    return 'drawn'
+
+
+class ManageFiguresTest(unittest.TestCase):
+    def test_figures_are_closed(self):
+        reset_figure_stats()
+        open_before = len(plt.get_fignums())
+        self.assertEqual(draw_two_figures(), 'drawn')
+        self.assertRaises(ValueError, draw_two_figures, 0, True)
+        self.assertEqual(len(plt.get_fignums()), open_before)
+        self.assertEqual(figure_stats['figures_closed'], 4)
+        self.assertEqual(figure_stats['live_figures'], open_before)
+
+
+class SaveImageDataTest(unittest.TestCase):
+    def setUp(self):
+        self.fig = plt.figure()
+        plt.plot([1, 2, 3])
+
+    def tearDown(self):
+        plt.close(self.fig)
+
+    def test_saved_file_matches_returned_image(self):
+        with tempfile.TemporaryDirectory() as mk_dir:
+            png_data = save_image_data(self.fig, 'png', 'line', mk_dir)
+            with open(os.path.join(mk_dir, 'line.png'), 'rb') as image_file:
+                self.assertEqual(base64.b64decode(png_data), image_file.read())
+            svg_data = save_image_data(self.fig, 'svg', 'line', mk_dir, '_1_')
+            with open(os.path.join(mk_dir, 'line_1_.svg')) as image_file:
+                self.assertEqual(svg_data, image_file.read())
+
+    def test_no_directory_keeps_image_in_memory(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cwd = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                svg_data = save_image_data(self.fig, 'svg', 'line', None)
+            finally:
+                os.chdir(cwd)
+            self.assertEqual(os.listdir(tmp_dir), [])
+        self.assertTrue(svg_data.lstrip().startswith('<?xml'))
+
+
+class AverageNumsByCatTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'city': rng.choice(['a', 'b', 'c'], 200),
+                                'size': rng.choice([1, 2], 200),
+                                'x': rng.normal(size=200),
+                                'y': rng.normal(size=200),
+                                'name': ['text'] * 200})
+
+    def test_matches_one_groupby_per_pair(self):
+        averages = average_nums_by_cat(self.df, ['city', 'size'], ['x', 'y', 'name'])
+        for cat in ['city', 'size']:
+            self.assertEqual(averages[cat].columns.tolist(), ['x', 'y'])
+            for num in ['x', 'y']:
+                pd.testing.assert_series_equal(averages[cat][num],
+                                               self.df.groupby(cat)[num].mean())
+
+    def test_plot_reads_from_averages(self):
+        averages = average_nums_by_cat(self.df, ['city'], ['x', 'name'])
+        fig = plot_fast_average_num_by_cat(self.df, ['city'], ['x', 'name'], verbose=2,
+                                           averages=averages)
+        titles = [ax.get_title() for ax in fig.axes]
+        self.assertIn('Average x by city (Top 20)', titles)
+        self.assertIn('No plot as name is not numeric', titles)
+        plt.close(fig)
+
+
+class DecimateFrameTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        index = pd.date_range('2020-01-01', periods=50000, freq='s')
+        self.df = pd.DataFrame({'a': rng.normal(size=50000), 'b': rng.normal(size=50000)}, index=index)
+        self.df.iloc[12345, 0] = 100.0
+        self.df.iloc[30000, 1] = -100.0
+
+    def test_peaks_are_kept(self):
+        for method in ['minmax', 'lttb']:
+            small = decimate_frame(self.df, max_points=500, method=method)
+            self.assertLessEqual(len(small), 1000)
+            self.assertTrue(small.index.is_monotonic_increasing)
+            self.assertEqual(small['a'].max(), 100.0)
+            self.assertEqual(small['b'].min(), -100.0)
+            self.assertEqual(small.index[0], self.df.index[0])
+            self.assertEqual(small.index[-1], self.df.index[-1])
+
+    def test_short_and_unordered_series(self):
+        self.assertEqual(len(decimate_frame(self.df['a'].head(100))), 100)
+        shuffled = self.df['a'].sample(frac=1, random_state=0)
+        small = decimate_frame(shuffled, max_points=200)
+        self.assertTrue(small.index.is_monotonic_increasing)
+        self.assertEqual(small.max(), 100.0)
+        self.assertEqual(len(decimation_positions(np.arange(10.0), np.arange(10.0), 4, 'lttb')), 4)
+        self.assertRaises(ValueError, decimation_positions, np.arange(10.0), np.arange(10.0), 4, 'every')
+
+
+class AggregateTimeSeriesTest(unittest.TestCase):
+    def test_frequency_follows_span_and_spacing(self):
+        self.assertIsNone(pick_resample_frequency(pd.date_range('2020-01-01', periods=100, freq='D')))
+        self.assertEqual(pick_resample_frequency(pd.date_range('2020-01-01', periods=10000, freq='min')),
+                         pd.offsets.Hour())
+        self.assertEqual(pick_resample_frequency(pd.date_range('2000-01-01', periods=10000, freq='D')),
+                         pd.offsets.Week(weekday=6))
+
+    def test_one_groupby_gives_class_and_overall_averages(self):
+        rng = np.random.default_rng(0)
+        dates = pd.Series(pd.date_range('2020-01-01', periods=5000, freq='min')).sample(frac=1, random_state=0)
+        df = pd.DataFrame({'x': rng.normal(size=5000), 'y': rng.normal(size=5000),
+                           'label': rng.choice(['a', 'b'], 5000), 'name': ['text'] * 5000})
+        df.loc[3, 'x'] = np.nan
+        aggregates = aggregate_time_series(df, dates.values, ['x', 'y', 'name', 'label'], dep='label',
+                                           max_buckets=100)
+        self.assertEqual(aggregates['frequency'], pd.offsets.Hour())
+        hours = dates.dt.floor('h').values
+        expected = df[['x', 'y']].groupby(hours).mean()
+        np.testing.assert_allclose(aggregates['overall'].to_numpy(), expected.to_numpy())
+        expected = df[['x', 'y']].groupby([df['label'], hours]).mean()
+        np.testing.assert_allclose(aggregates['by_class'].to_numpy(), expected.to_numpy())
+        self.assertEqual(aggregates['by_class'].xs('a', level=0).shape, (84, 2))
+
+
+class PairScattersTest(unittest.TestCase):
+    def test_classes_drawn_without_changing_data(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'x': rng.normal(size=300), 'y': rng.normal(size=300), 'z': rng.normal(size=300),
+                           'label': rng.choice(['a', 'b', 'c'], 300)})
+        before = df.copy()
+        images = draw_pair_scatters(df, ['x', 'y', 'z'], 'Multi_Classification', 2, 'svg', dep='label',
+                                    classes=['a', 'b', 'c'])
+        self.assertEqual(len(images), 1)
+        pd.testing.assert_frame_equal(df, before)
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+import unittest
+
+CHECK_IMPORT = """
+import sys
+import autoviz
+print(','.join(name for name in ['matplotlib', 'sklearn', 'xgboost', 'scipy', 'pandas_dq', 'holoviews',
+                                 'wordcloud', 'textblob', 'nltk', 'emoji'] if name in sys.modules))
+"""
+
+CHECK_DQ = """
+import sys
+from autoviz import data_cleaning_suggestions, FixDQ
+print(','.join(name for name in ['matplotlib', 'seaborn', 'xgboost', 'holoviews'] if name in sys.modules))
+"""
+
+CHECK_CLASS = """
+from autoviz.AutoViz_Class import FixDQ
+import autoviz.AutoViz_Class
+from autoviz import AutoViz_Class
+print(isinstance(AutoViz_Class, type), AutoViz_Class is autoviz.AutoViz_Class)
+"""
+
+
+class ImportTest(unittest.TestCase):
+    def test_import_autoviz_does_not_load_heavy_dependencies(self):
+        output = subprocess.run([sys.executable, '-c', CHECK_IMPORT], check=True, capture_output=True,
+                                text=True).stdout.splitlines()
+        self.assertEqual(output[-1], '')
+
+    def test_data_quality_tools_do_not_load_the_plotting_stack(self):
+        output = subprocess.run([sys.executable, '-c', CHECK_DQ], check=True, capture_output=True,
+                                text=True).stdout.splitlines()
+        self.assertEqual(output[-1], '')
+
+    def test_autoviz_class_is_the_class_after_importing_the_submodule(self):
+        output = subprocess.run([sys.executable, '-c', CHECK_CLASS], check=True, capture_output=True,
+                                text=True).stdout.splitlines()
+        self.assertEqual(output[-1], 'True True')
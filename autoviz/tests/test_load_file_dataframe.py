@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from autoviz.AutoViz_Class import AutoViz_Class
+from autoviz.AutoViz_Utils import load_file_dataframe, read_csv_reservoir_sample
+
+
+class ReservoirSampleTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'data.csv')
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'row': np.arange(5000), 'x': rng.normal(size=5000),
+                                'cat': rng.choice(list('abc'), size=5000)})
+        self.df.to_csv(self.filename, index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sample_size_and_schema(self):
+        sample, total_rows = read_csv_reservoir_sample(self.filename, 300, chunksize=256)
+        self.assertEqual(total_rows, 5000)
+        self.assertEqual(sample.shape, (300, 3))
+        self.assertEqual(list(sample.dtypes), list(self.df.dtypes))
+        ### sampled rows keep their row position in the file as index
+        self.assertTrue((sample.index.values == sample['row'].values).all())
+        self.assertTrue(sample.index.is_unique)
+
+    def test_same_seed_gives_same_sample(self):
+        first = load_file_dataframe(self.filename, nrows=300, chunksize=500, random_state=7)
+        second = load_file_dataframe(self.filename, nrows=300, chunksize=500, random_state=7)
+        third = load_file_dataframe(self.filename, nrows=300, chunksize=500, random_state=8)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertFalse(first['row'].equals(third['row']))
+
+    def test_small_file_is_loaded_whole(self):
+        dfte = load_file_dataframe(self.filename, nrows=10000, chunksize=1000)
+        pd.testing.assert_frame_equal(dfte, self.df)
+
+
+class DataFrameInputTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'x': rng.normal(size=200), 'y': rng.normal(size=200),
+                                'label': rng.choice(['a', 'b'], 200)})
+        self.before = self.df.copy()
+
+    def test_loaded_frame_does_not_share_memory_with_input(self):
+        dfte = load_file_dataframe(self.df)
+        dfte.loc[dfte.index[0], 'x'] = -100.0
+        pd.testing.assert_frame_equal(self.df, self.before)
+
+    def test_frame_returned_by_autoviz_does_not_share_memory_with_input(self):
+        dft = AutoViz_Class().AutoViz('', dfte=self.df, depVar='label', verbose=2, chart_format='svg',
+                                      save_to_disk=False)
+        dft.loc[dft.index[0], 'x'] = -100.0
+        pd.testing.assert_frame_equal(self.df, self.before)
+
+
+class ColumnarReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'row': np.arange(5000), 'x': rng.normal(size=5000),
+                                'cat': rng.choice(list('abc'), size=5000)})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def check_sample(self, filename):
+        dfte = load_file_dataframe(filename, nrows=700, columns=['row', 'x'])
+        self.assertEqual(dfte.shape, (700, 2))
+        self.assertTrue((dfte.index.values == dfte['row'].values).all())
+        pd.testing.assert_frame_equal(dfte, self.df.loc[dfte.index, ['row', 'x']])
+
+    def test_parquet_row_groups(self):
+        filename = os.path.join(self.tmpdir.name, 'data.parquet')
+        self.df.to_parquet(filename, index=False, row_group_size=500)
+        self.check_sample(filename)
+        pd.testing.assert_frame_equal(load_file_dataframe(filename), self.df)
+
+    def test_feather_record_batches(self):
+        import pyarrow as pa
+        filename = os.path.join(self.tmpdir.name, 'data.feather')
+        with pa.OSFile(filename, 'wb') as sink:
+            table = pa.Table.from_pandas(self.df, preserve_index=False)
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=500)
+        self.check_sample(filename)
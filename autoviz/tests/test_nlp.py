@@ -0,0 +1,75 @@
+import subprocess
+import sys
+import unittest
+from collections import Counter
+
+import pandas as pd
+
+from autoviz import AutoViz_NLP
+from autoviz.AutoViz_NLP import clean_steps, clean_text, clean_text_column, count_words, count_words_by_class
+from autoviz.AutoViz_NLP import merge_word_counts
+
+
+HIDDEN_NLTK_DATA = """
+import tempfile
+import nltk
+nltk.data.path[:] = [tempfile.mkdtemp()]
+import numpy as np
+import pandas as pd
+from autoviz import AutoViz_Class
+from autoviz.AutoViz_NLP import load_lemmatizer, split_into_lemmas
+rng = np.random.default_rng(0)
+words = ['cats', 'dogs', 'birds', 'running', 'jumped', 'quickly', 'over', 'fences']
+df = pd.DataFrame({'text': [' '.join(rng.choice(words, 10)) + ' %d' % i for i in range(300)],
+                   'x': rng.normal(size=300), 'label': rng.choice(['a', 'b'], 300)})
+AV = AutoViz_Class()
+AV.AutoViz('', dfte=df, depVar='label', verbose=2, chart_format='svg', save_to_disk=False)
+print(load_lemmatizer() is None, split_into_lemmas('cats, dogs!'), len(AV.wordcloud['plots']))
+"""
+
+
+class SplitIntoLemmasTest(unittest.TestCase):
+    def test_wordclouds_are_drawn_without_nltk_data(self):
+        output = subprocess.run([sys.executable, '-c', HIDDEN_NLTK_DATA], check=True, capture_output=True,
+                                text=True).stdout
+        self.assertNotIn('Could not draw wordcloud', output)
+        self.assertEqual(output.splitlines()[-1], 'True cats dogs 1')
+
+
+class CleanTextColumnTest(unittest.TestCase):
+    def setUp(self):
+        self.saved_resources = dict(AutoViz_NLP.nltk_resources)
+        AutoViz_NLP.nltk_resources.update(loaded=True, lemmatize=None)
+
+    def tearDown(self):
+        AutoViz_NLP.nltk_resources.update(self.saved_resources)
+
+    def test_same_as_cleaning_one_row_at_a_time(self):
+        text = pd.Series(['OMG the cat sat on 10.0.0.1 today!', None, 'im gonna buy it for $5 (cheap)',
+                          'Visit [www] now; thx', 'the and of', 'Line one\nLine two'], index=[5, 3, 9, 1, 0, 7])
+        expected = text.fillna('missing').map(clean_steps).map(clean_text)
+        for chunksize in [2, 100]:
+            cleaned = clean_text_column(text, chunksize)
+            self.assertEqual(list(cleaned.index), list(text.index))
+            self.assertEqual([' '.join(x.split()) for x in cleaned], [' '.join(x.split()) for x in expected])
+
+    def test_words_are_counted_for_each_class_in_one_pass(self):
+        text = pd.Series(['red apples', 'green apples and pears', 'red pears', None], index=[3, 3, 1, 0])
+        target = pd.Series(['a', 'b', 'a', 'b'], index=text.index)
+        words_counts = count_words_by_class(text, target, chunksize=3)
+        self.assertEqual(sorted(words_counts), ['a', 'b'])
+        for each_class in ['a', 'b']:
+            self.assertEqual(words_counts[each_class], count_words(text[(target == each_class).values]))
+
+
+class MergeWordCountsTest(unittest.TestCase):
+    def test_frequent_words_are_kept_within_capacity(self):
+        words_counts = Counter()
+        for chunk in range(50):
+            chunk_counts = Counter({'common': 10, 'often': 5})
+            chunk_counts.update('rare_%d_%d' % (chunk, i) for i in range(20))
+            words_counts = merge_word_counts(words_counts, chunk_counts, capacity=30)
+            self.assertLessEqual(len(words_counts), 30)
+        self.assertEqual([word for word, _ in words_counts.most_common(2)], ['common', 'often'])
+        self.assertLessEqual(words_counts['common'], 500)
+        self.assertGreaterEqual(words_counts['common'], 500 - 50 * 30 // 31)
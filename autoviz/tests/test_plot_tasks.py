@@ -0,0 +1,89 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from autoviz.AutoViz_Class import AutoViz_Class
+from autoviz.AutoViz_Utils import reset_stage_stats, run_plot_tasks, stage_stats, stage_timer
+
+
+def fake_autoviz_holo(filename, *args):
+    with stage_timer('holo_charts', *filename.shape):
+        return filename
+
+
+class PlotTasksTest(unittest.TestCase):
+    def test_results_come_back_in_task_order(self):
+        dft = pd.DataFrame({'a': range(5)})
+        plot_tasks = [('length', len, (), 'Could not count'),
+                      ('check', isinstance, (pd.DataFrame,), 'Could not check'),
+                      ('broken', divmod, ('x',), 'Could not divide')]
+        for n_jobs in [1, 2]:
+            results = run_plot_tasks(dft, plot_tasks, n_jobs)
+            self.assertEqual(results[:2], [(5, None), (True, None)])
+            self.assertIsNone(results[2][0])
+            self.assertTrue(results[2][1].startswith('Could not divide'))
+
+    def test_traceback_is_printed_if_verbose(self):
+        dft = pd.DataFrame({'a': range(5)})
+        plot_tasks = [('broken', divmod, ('x',), 'Could not divide')]
+        for verbose in [0, 1]:
+            errors = io.StringIO()
+            with contextlib.redirect_stderr(errors):
+                run_plot_tasks(dft, plot_tasks, 1, verbose)
+            self.assertEqual('Traceback' in errors.getvalue(), verbose == 1)
+
+    def test_plots_are_drawn_one_at_a_time_except_on_linux(self):
+        dft = pd.DataFrame({'a': range(5)})
+        output = io.StringIO()
+        with mock.patch.object(sys, 'platform', 'darwin'), contextlib.redirect_stdout(output):
+            self.assertEqual(run_plot_tasks(dft, [('length', len, (), 'Could not count')] * 2, 2),
+                             [(5, None)] * 2)
+        self.assertIn('one at a time', output.getvalue())
+
+    def test_each_task_is_timed(self):
+        dft = pd.DataFrame({'a': range(5), 'b': range(5)})
+        plot_tasks = [('length', len, (), 'Could not count'),
+                      ('check', isinstance, (pd.DataFrame,), 'Could not check')]
+        for n_jobs in [1, 2]:
+            reset_stage_stats()
+            run_plot_tasks(dft, plot_tasks, n_jobs)
+            self.assertEqual(sorted(stage['stage'] for stage in stage_stats), ['isinstance', 'len'])
+            for stage in stage_stats:
+                self.assertEqual((stage['rows'], stage['columns']), (5, 2))
+                self.assertGreaterEqual(stage['wall_time'], 0)
+                self.assertEqual(stage['bytes_written'], 0)
+
+
+    def test_tasks_can_be_timed_under_their_own_stage(self):
+        dft = pd.DataFrame({'a': range(5)})
+        plot_tasks = [('length', len, (), 'Could not count', 'len_a'),
+                      ('length', len, (), 'Could not count', 'len_b')]
+        reset_stage_stats()
+        self.assertEqual(run_plot_tasks(dft, plot_tasks), [(5, None)] * 2)
+        self.assertEqual([stage['stage'] for stage in stage_stats], ['len_a', 'len_b'])
+
+
+class StageStatsTest(unittest.TestCase):
+    def test_every_run_is_reset_and_exported_on_the_bokeh_path(self):
+        df = pd.DataFrame({'a': range(5), 'b': range(5)})
+        holo = types.ModuleType('autoviz.AutoViz_Holo')
+        holo.AutoViz_Holo = fake_autoviz_holo
+        AV = AutoViz_Class()
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.dict(sys.modules, {'autoviz.AutoViz_Holo': holo}):
+            stats_file = os.path.join(tmp_dir, 'stats.jsonl')
+            for run in range(2):
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    AV.AutoViz('', dfte=df, chart_format='bokeh', verbose=1, stats_file=stats_file)
+                self.assertEqual(AV.stage_stats['stage'].tolist(), ['holo_charts'])
+                self.assertNotIn('wall_time', output.getvalue())
+            with open(stats_file) as f:
+                self.assertEqual([json.loads(line)['stage'] for line in f], ['holo_charts'] * 2)
@@ -0,0 +1,45 @@
+"""
+Time and quality of find_top_features_xgb with the current (exact trees, one model at a time) and the fast
+(histogram trees, models fitted at the same time on a sample of rows) ways of ranking features.
+
+    python benchmarks/benchmark_feature_ranking.py [rows] [columns]
+
+Only the first 10 columns of the synthetic data set decide the target. Recall is the share of them
+among the features that were found important.
+"""
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def make_dataset(rows, columns, informative=10, seed=0):
+    rng = np.random.default_rng(seed)
+    data = rng.normal(size=(rows, columns)).astype(np.float32)
+    df = pd.DataFrame(data, columns=['num_%d' % i for i in range(columns)])
+    score = data[:, :informative] @ rng.uniform(0.5, 1.5, size=informative)
+    df['y_cls'] = np.where(score + rng.normal(size=rows) > 0, 'high', 'low')
+    return df, ['num_%d' % i for i in range(informative)]
+
+
+def main(rows=50000, columns=500):
+    from autoviz.AutoViz_Utils import find_top_features_xgb
+
+    df, informative = make_dataset(rows, columns)
+    preds = [x for x in df if x != 'y_cls']
+    print('%8s %8s %6s %10s %10s %8s' % ('rows', 'columns', 'fast', 'time', 'selected', 'recall'))
+    for fast in [False, True]:
+        start = time.time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            important_features, _, _ = find_top_features_xgb(df, preds, preds, 'y_cls', 'Binary_Classification',
+                                                             corr_limit=0.7, fast=fast)
+        elapsed = time.time() - start
+        recall = len(set(informative) & set(important_features)) / len(informative)
+        print('%8d %8d %6s %9.1fs %10d %8.2f' % (rows, columns, fast, elapsed, len(important_features), recall))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000, int(sys.argv[2]) if len(sys.argv) > 2 else 500)
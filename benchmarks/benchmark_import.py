@@ -0,0 +1,41 @@
+"""
+Cold-start time of "import autoviz".
+
+    python benchmarks/benchmark_import.py [budget_seconds]
+
+Each import runs in a fresh interpreter. The median of 5 runs is compared with the budget (default 1 second)
+and the script exits with status 1 if it is over budget or if a heavy dependency was imported eagerly.
+"""
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'sklearn', 'xgboost', 'scipy', 'pandas_dq', 'holoviews', 'bokeh',
+                 'panel', 'hvplot', 'wordcloud', 'textblob', 'nltk', 'emoji']
+
+CHECK_IMPORT = """
+import sys, time
+start = time.perf_counter()
+import autoviz
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(name for name in %r if name in sys.modules))
+""" % HEAVY_MODULES
+
+
+def time_import():
+    output = subprocess.run([sys.executable, '-c', CHECK_IMPORT], check=True, capture_output=True,
+                            text=True).stdout.splitlines()
+    return float(output[-2]), [name for name in output[-1].split(',') if name]
+
+
+def main(budget=1.0, runs=5):
+    results = [time_import() for _ in range(runs)]
+    median = statistics.median(elapsed for elapsed, _ in results)
+    loaded = results[-1][1]
+    print('import autoviz: median=%.3fs budget=%.3fs heavy modules loaded=%s' % (median, budget, loaded or 'none'))
+    return 0 if median <= budget and not loaded else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0))
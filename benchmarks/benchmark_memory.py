@@ -0,0 +1,66 @@
+"""
+Peak memory of AutoViz on a synthetic data set.
+
+    python benchmarks/benchmark_memory.py [rows] [all]
+
+The first number is the peak while the data is loaded, classified, sampled and its top features are
+found with XGBoost (classify_print_vars), which is where copies of the whole data frame used to pile up.
+With "all", a full AutoViz() call that saves every chart as svg is measured as well (this takes minutes).
+Peak memory is measured with tracemalloc, which also tracks numpy and pandas buffers.
+"""
+import contextlib
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def make_dataset(rows, extra_cols=30, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'num_%d' % i: rng.normal(size=rows) for i in range(8 + extra_cols)})
+    for i in range(4):
+        df['cat_%d' % i] = rng.choice(list('abcdefgh')[:3 + i], size=rows)
+    df['flag'] = rng.choice(['yes', 'no'], size=rows)
+    df['count'] = rng.integers(0, 10, size=rows)
+    df['y_cls'] = np.where(df['num_0'] * 3 + df['num_1'] + rng.normal(size=rows) > 1, 'high', 'low')
+    return df
+
+
+def measure(label, df, func):
+    tracemalloc.start()
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    data_mb = df.memory_usage(deep=True).sum() / 1e6
+    print('%s: rows=%d cols=%d data=%.1f MB peak=%.1f MB (%.1fx data) time=%.1fs' % (
+        label, df.shape[0], df.shape[1], data_mb, peak / 1e6, peak / 1e6 / data_mb, elapsed))
+
+
+def main(rows=150000, run_all=False):
+    from autoviz import AutoViz_Class
+    from autoviz.AutoViz_Utils import classify_print_vars, copy_on_write
+
+    df = make_dataset(rows)
+
+    def classify():
+        with copy_on_write():
+            classify_print_vars(df, ',', rows, 30, 'y_cls', 0, 0)
+
+    measure('classify_print_vars', df, classify)
+    if run_all:
+        small = df[[x for x in df if not x.startswith('num_') or int(x[4:]) < 8]]
+        with tempfile.TemporaryDirectory() as save_plot_dir:
+            measure('AutoViz', small, lambda: AutoViz_Class().AutoViz(
+                '', depVar='y_cls', dfte=small, verbose=2, chart_format='svg',
+                max_rows_analyzed=rows, save_plot_dir=save_plot_dir))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 150000, 'all' in sys.argv[2:])
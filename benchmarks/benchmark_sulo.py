@@ -0,0 +1,57 @@
+"""
+Scaling of SULO correlation pruning (remove_variables_using_fast_correlation) with the number of columns.
+
+    python benchmarks/benchmark_sulo.py [rows] [columns ...]
+
+The columns come in groups of 5 that are highly correlated with each other. For each number of columns,
+the time and peak memory (tracemalloc) to find the correlated pairs and to run the whole SULO method are printed.
+"""
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def make_dataset(rows, columns, group_size=5, seed=0):
+    rng = np.random.default_rng(seed)
+    groups = rng.normal(size=(rows, (columns + group_size - 1) // group_size)).astype(np.float32)
+    data = np.repeat(groups, group_size, axis=1)[:, :columns]
+    data += rng.normal(scale=0.3, size=data.shape).astype(np.float32)
+    df = pd.DataFrame(data, columns=['num_%d' % i for i in range(columns)])
+    df['target'] = data[:, 0] + rng.normal(size=rows).astype(np.float32)
+    return df
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main(rows=2000, sizes=(500, 1000, 2000, 5000, 10000)):
+    from autoviz.AutoViz_Utils import find_correlated_adjacency, remove_variables_using_fast_correlation
+
+    print('%8s %8s %12s %12s %10s %12s %10s' % ('rows', 'columns', 'pairs_time', 'pairs_MB', 'sulo_time',
+                                                'sulo_MB', 'selected'))
+    for columns in sizes:
+        df = make_dataset(rows, columns)
+        numvars = [x for x in df if x != 'target']
+        _, pairs_time, pairs_mb = measure(lambda: find_correlated_adjacency(df, numvars, 0.7))
+        selected, sulo_time, sulo_mb = measure(lambda: remove_variables_using_fast_correlation(
+            df, numvars, 'Regression', 'target', 0.7))
+        print('%8d %8d %11.2fs %12.1f %9.2fs %12.1f %10d' % (rows, columns, pairs_time, pairs_mb, sulo_time,
+                                                            sulo_mb, len(selected)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+         [int(x) for x in sys.argv[2:]] or (500, 1000, 2000, 5000, 10000))
@@ -50,6 +50,9 @@ setuptools.setup(
     url="https://github.com/AutoViML/AutoViz.git",
     packages=setuptools.find_packages(exclude=("tests",)),
     install_requires=install_requires,
+    extras_require={
+        "columnar": ["pyarrow"], ## needed only to read Parquet, Feather and Arrow files
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",